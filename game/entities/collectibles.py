@@ -0,0 +1,206 @@
+import pygame
+from utils import load_image, get_frames_from_spritesheet
+from utils.pool import ObjectPool
+from utils.spatial_hash import SpatialHash
+
+# Pool sizes, chosen so normal play never exhausts them
+MAX_COLLECTIBLES = 64
+MAX_PROJECTILES = 32
+
+
+# Money pickup. Instances are owned by an ObjectPool and reset in place.
+class Collectible:
+    def __init__(self, frames):
+        # Frames are shared by every collectible
+        self.frames = frames
+        self.image = frames[0]
+        self.rect = self.image.get_rect()
+        self.value = 0
+        self.current_frame = 0
+        self.animation_timer = 0
+        self.animation_speed = 6  # frames to wait before changing animation frame
+
+    def reset(self, x, y, value=1):
+        self.rect.x = x
+        self.rect.y = y
+        self.value = value
+        # Offset the animation so neighbouring coins don't spin in lockstep
+        self.current_frame = (x // self.rect.width) % len(self.frames)
+        self.animation_timer = 0
+        self.image = self.frames[self.current_frame]
+
+    def update(self):
+        self.animation_timer += 1
+        if self.animation_timer >= self.animation_speed:
+            self.animation_timer = 0
+            self.current_frame = (self.current_frame + 1) % len(self.frames)
+            self.image = self.frames[self.current_frame]
+
+
+# Straight-flying projectile. Instances are owned by an ObjectPool and reset in place.
+class Projectile:
+    def __init__(self, image):
+        self.image = image
+        self.rect = self.image.get_rect()
+        self.velocity_x = 0
+        self.velocity_y = 0
+        self.lifetime = 0
+
+    def reset(self, x, y, velocity_x, velocity_y=0, lifetime=90):
+        self.rect.centerx = x
+        self.rect.centery = y
+        self.velocity_x = velocity_x
+        self.velocity_y = velocity_y
+        self.lifetime = lifetime
+
+    def update(self):
+        self.rect.x += self.velocity_x
+        self.rect.y += self.velocity_y
+        self.lifetime -= 1
+
+
+class CollectibleSystem:
+    """
+    Pooled collectibles and projectiles for one level.
+
+    Collectibles are indexed in a spatial hash so the per-frame pickup check
+    only tests coins near the player instead of every coin in the level.
+    If a BVH over the platforms is given, projectiles are swept along their
+    path against it instead of being tested against every platform.
+    """
+
+    def __init__(self, platforms, screen_width, screen_height, solids=None):
+        self.platforms = platforms
+        self.solids = solids
+        self.SCREEN_WIDTH = screen_width
+        self.SCREEN_HEIGHT = screen_height
+
+        try:
+            money_sheet = load_image('money.png')
+            coin_frames = get_frames_from_spritesheet(money_sheet, 24, 24)
+        except Exception:
+            # Fallback if sprite sheet not found
+            coin = pygame.Surface((24, 24), pygame.SRCALPHA)
+            pygame.draw.circle(coin, (255, 215, 0), (12, 12), 10)  # Gold
+            coin_frames = [coin]
+
+        projectile_image = pygame.Surface((10, 4))
+        projectile_image.fill((255, 170, 0))  # Orange
+
+        self.collectibles = ObjectPool(lambda: Collectible(coin_frames), MAX_COLLECTIBLES)
+        self.projectiles = ObjectPool(lambda: Projectile(projectile_image), MAX_PROJECTILES)
+        self.collectible_index = SpatialHash(cell_size=64)
+
+        self.score = 0
+        self.frame_count = 0
+        
+        # World position of the left edge of the view, for scrolling levels
+        self.view_x = 0
+
+        # Positions where projectiles hit a platform this frame
+        self.impacts = []
+
+    def spawn_collectible(self, x, y, value=1):
+        collectible = self.collectibles.spawn(x, y, value)
+        if collectible is not None:
+            self.collectible_index.insert(collectible)
+        return collectible
+
+    def despawn_collectible(self, collectible):
+        self.collectible_index.remove(collectible)
+        self.collectibles.despawn(collectible)
+
+    def spawn_projectile(self, x, y, velocity_x, velocity_y=0):
+        return self.projectiles.spawn(x, y, velocity_x, velocity_y)
+
+    def place_on_platforms(self, spacing=60, height=40, platforms=None):
+        """Spawn a row of coins above every platform, or the given ones."""
+        for platform in platforms if platforms is not None else self.platforms:
+            for x in range(platform.rect.left + spacing // 2, platform.rect.right - 24, spacing):
+                self.spawn_collectible(x, platform.rect.top - height)
+
+    def despawn_before(self, x):
+        """Despawn coins that are entirely left of a world position."""
+        active = self.collectibles.active
+        for i in range(len(active) - 1, -1, -1):
+            if active[i].rect.right < x:
+                self.despawn_collectible(active[i])
+
+    def fire_from(self, player, speed=12):
+        """Fire a projectile from the player's hitbox in the direction they face."""
+        direction = 1 if player.facing_right else -1
+        rect = player.collision_rect
+        x = rect.right if direction > 0 else rect.left
+        return self.spawn_projectile(x, rect.centery, speed * direction)
+
+    def update(self, player):
+        self.frame_count += 1
+        self.impacts.clear()
+
+        for collectible in self.collectibles.active:
+            collectible.update()
+
+        # Pickup check only against coins in the cells around the player
+        for collectible in self.collectible_index.query(player.collision_rect):
+            self.score += collectible.value
+            self.despawn_collectible(collectible)
+
+        # Iterate backwards so despawning (swap-remove) doesn't skip projectiles
+        active = self.projectiles.active
+        for i in range(len(active) - 1, -1, -1):
+            projectile = active[i]
+            previous = projectile.rect.center
+            projectile.update()
+
+            expired = (
+                projectile.lifetime <= 0
+                or projectile.rect.right < self.view_x
+                or projectile.rect.left > self.view_x + self.SCREEN_WIDTH
+                or projectile.rect.top > self.SCREEN_HEIGHT
+            )
+            if not expired and self.solids is not None:
+                hit = self.solids.segment_first(previous, projectile.rect.center)
+                if hit is not None:
+                    # Impact where the path entered the platform
+                    self.impacts.append(hit[1])
+                    expired = True
+                elif self.solids.query_rect(projectile.rect, first_only=True):
+                    self.impacts.append(projectile.rect.center)
+                    expired = True
+            elif not expired:
+                for platform in self.platforms:
+                    if projectile.rect.colliderect(platform.rect):
+                        self.impacts.append(projectile.rect.center)
+                        expired = True
+                        break
+
+            if expired:
+                self.projectiles.despawn(projectile)
+
+    def draw(self, surface):
+        for collectible in self.collectibles.active:
+            surface.blit(collectible.image, collectible.rect)
+        for projectile in self.projectiles.active:
+            surface.blit(projectile.image, projectile.rect)
+
+    def clear(self):
+        self.collectible_index.clear()
+        self.collectibles.clear()
+        self.projectiles.clear()
+        self.impacts.clear()
+
+    def get_stats(self, fps=60):
+        """
+        Get pool usage counters and spawn/despawn rates.
+
+        Args:
+            fps (int): Frame rate used to convert frame counts to seconds
+
+        Returns:
+            dict: Stats dicts for the 'collectibles' and 'projectiles' pools
+        """
+        elapsed = self.frame_count / fps if self.frame_count else None
+        return {
+            'collectibles': self.collectibles.get_stats(elapsed),
+            'projectiles': self.projectiles.get_stats(elapsed),
+        }
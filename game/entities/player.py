@@ -1,5 +1,6 @@
 import pygame
 from utils import load_image, get_frames_from_spritesheet
+from utils.mask import get_state_masks, collide_mask_aabb
 
 class Player(pygame.sprite.Sprite):
     def __init__(self, x, y, platforms, screen_width, screen_height):
@@ -10,10 +11,21 @@ class Player(pygame.sprite.Sprite):
         self.JUMP_POWER = 17
         self.PLAYER_SPEED = 5
         
+        # Furthest a new animation frame can overlap a platform and still be
+        # pushed back out of it
+        self.MAX_PENETRATION = 8
+        
         # Store screen boundaries
         self.SCREEN_WIDTH = screen_width
         self.SCREEN_HEIGHT = screen_height
         
+        # Horizontal limits the player is kept within, None for no limit
+        self.bounds_left = 0
+        self.bounds_right = screen_width
+        
+        # Where the player reappears after falling off the bottom
+        self.spawn_point = (100, 100)
+        
         # Store platforms for collision detection
         self.platforms = platforms
         
@@ -41,112 +53,123 @@ class Player(pygame.sprite.Sprite):
             self.run_frames_left = []
             for frame in self.run_frames_right:
                 self.run_frames_left.append(pygame.transform.flip(frame, True, False))
+            self.idle_frames_left = []
+            for frame in self.idle_frames:
+                self.idle_frames_left.append(pygame.transform.flip(frame, True, False))
             
-            # Set jump frame
+            # Set jump frames
             self.jump_frame = jump_img
+            self.jump_frame_left = pygame.transform.flip(jump_img, True, False)
             
             self.using_sprites = True
             self.image = self.idle_frames[0]  # Start with first idle frame
             
+            # Frames of each movement state, which share one collision mask
+            frame_groups = [self.idle_frames, self.idle_frames_left, self.run_frames_right,
+                            self.run_frames_left, [self.jump_frame], [self.jump_frame_left]]
+            
         except Exception:
             # Fallback if sprite sheets not found
             self.image = pygame.Surface((30, 50))
             self.image.fill((0, 0, 255))  # Blue
             self.using_sprites = False
+            frame_groups = [[self.image]]
+        
+        # Precompute a collision mask and tight bounding box for every frame.
+        # Frames of the same movement state share the union of their masks,
+        # so the animation playing doesn't move the player against platforms.
+        self.frame_masks = get_state_masks(frame_groups)
+        self.mask, self.mask_bounds = self.frame_masks[self.image]
         
         # Create main sprite rectangle
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
         
-        # Create smaller collision rectangle
-        # Adjust these values to make the hitbox fit your character properly
-        self.collision_width = int(self.frame_width * 0.3)  # 30% of sprite width
-        self.collision_height = int(self.frame_height * 0.6)  # 60% of sprite height
-        
-        # Center the collision box horizontally, align with bottom of sprite
-        self.collision_rect = pygame.Rect(
-            x + (self.frame_width - self.collision_width) // 2,
-            y + self.frame_height - self.collision_height,
-            self.collision_width,
-            self.collision_height
-        )
+        # Collision rectangle tightly bounds the current frame's mask and is
+        # used as the broadphase before the mask overlap test
+        self.collision_rect = pygame.Rect(0, 0, 0, 0)
+        self.sync_collision_rect()
         
         self.velocity_y = 0
         self.velocity_x = 0
         self.on_ground = False
         
+    def sync_collision_rect(self):
+        """Move the collision rect to the current frame's mask bounds."""
+        self.collision_rect.x = self.rect.x + self.mask_bounds.x
+        self.collision_rect.y = self.rect.y + self.mask_bounds.y
+        self.collision_rect.width = self.mask_bounds.width
+        self.collision_rect.height = self.mask_bounds.height
+        
+    def set_image(self, image):
+        """Switch to another animation frame along with its cached mask."""
+        if image is not self.image:
+            self.image = image
+            self.mask, self.mask_bounds = self.frame_masks[image]
+            self.sync_collision_rect()
+    
+    def hits_platform(self):
+        """Check for a pixel-perfect collision with any platform."""
+        self.sync_collision_rect()
+        for platform in self.platforms:
+            if collide_mask_aabb(self, platform):
+                return True
+        return False
+        
     def update(self):
         # Apply gravity
         self.velocity_y += self.GRAVITY
         
-        # Store original positions
+        # Move horizontally
         original_x = self.rect.x
-        original_y = self.rect.y
-        
-        # Move horizontally - main rect first
         self.rect.x += self.velocity_x
         
-        # Update collision rect horizontal position
-        self.collision_rect.x = self.rect.x + (self.frame_width - self.collision_width) // 2
+        # Step back out of any platform we walked into, one pixel at a time
+        if self.velocity_x != 0 and self.hits_platform():
+            step = -1 if self.velocity_x > 0 else 1
+            for _ in range(abs(self.velocity_x)):
+                self.rect.x += step
+                if not self.hits_platform():
+                    break
+            else:
+                self.rect.x = original_x
         
-        # Check for horizontal collisions using collision_rect
-        platform_hit_list = []
-        for platform in self.platforms:
-            if self.collision_rect.colliderect(platform.rect):
-                platform_hit_list.append(platform)
-                
-        for platform in platform_hit_list:
-            if self.velocity_x > 0:  # Moving right
-                self.collision_rect.right = platform.rect.left
-                # Update main rect based on collision rect
-                self.rect.x = self.collision_rect.x - (self.frame_width - self.collision_width) // 2
-            elif self.velocity_x < 0:  # Moving left
-                self.collision_rect.left = platform.rect.right
-                # Update main rect based on collision rect
-                self.rect.x = self.collision_rect.x - (self.frame_width - self.collision_width) // 2
-        
-        # Move vertically - main rect first
+        # Move vertically
+        original_y = self.rect.y
         self.rect.y += self.velocity_y
         
-        # Update collision rect vertical position
-        self.collision_rect.y = self.rect.y + self.frame_height - self.collision_height
-        
-        # Check for vertical collisions using collision_rect
         self.on_ground = False
-        platform_hit_list = []
-        for platform in self.platforms:
-            if self.collision_rect.colliderect(platform.rect):
-                platform_hit_list.append(platform)
-                
-        for platform in platform_hit_list:
-            if self.velocity_y > 0:  # Moving down
-                self.collision_rect.bottom = platform.rect.top
-                self.on_ground = True
-            elif self.velocity_y < 0:  # Moving up
-                self.collision_rect.top = platform.rect.bottom
+        if self.velocity_y != 0 and self.hits_platform():
+            step = -1 if self.velocity_y > 0 else 1
+            for _ in range(abs(self.velocity_y) + self.MAX_PENETRATION):
+                self.rect.y += step
+                if not self.hits_platform():
+                    # Landed on top of a platform
+                    if self.velocity_y > 0:
+                        self.on_ground = True
+                    break
+            else:
+                self.rect.y = original_y
                 
             self.velocity_y = 0
-            # Update main rect based on collision rect
-            self.rect.y = self.collision_rect.y - (self.frame_height - self.collision_height)
+        
+        self.sync_collision_rect()
             
         # Keep player on screen
-        if self.collision_rect.left < 0:
-            self.collision_rect.left = 0
-            self.rect.x = self.collision_rect.x - (self.frame_width - self.collision_width) // 2
-        if self.collision_rect.right > self.SCREEN_WIDTH:
-            self.collision_rect.right = self.SCREEN_WIDTH
-            self.rect.x = self.collision_rect.x - (self.frame_width - self.collision_width) // 2
+        if self.bounds_left is not None and self.collision_rect.left < self.bounds_left:
+            self.rect.x += self.bounds_left - self.collision_rect.left
+        if self.bounds_right is not None and self.collision_rect.right > self.bounds_right:
+            self.rect.x -= self.collision_rect.right - self.bounds_right
         
         # Check for falling off the bottom
         if self.collision_rect.top > self.SCREEN_HEIGHT:
             # Reset position
-            self.rect.x = 100
-            self.rect.y = 100
-            self.collision_rect.x = 100 + (self.frame_width - self.collision_width) // 2
-            self.collision_rect.y = 100 + self.frame_height - self.collision_height
+            self.rect.x, self.rect.y = self.spawn_point
             self.velocity_y = 0
         
+        self.sync_collision_rect()
+        
         # Update animation
         if self.using_sprites:
             self.animation_timer += 1
@@ -155,22 +178,74 @@ class Player(pygame.sprite.Sprite):
                 self.animation_timer = 0
                 self.current_frame = (self.current_frame + 1) % len(self.idle_frames)
                 
-            # Set correct animation frame based on state
-            if not self.on_ground:
-                self.image = self.jump_frame
-                if not self.facing_right:
-                    self.image = pygame.transform.flip(self.jump_frame, True, False)
-            elif self.velocity_x > 0:
-                self.facing_right = True
-                self.image = self.run_frames_right[self.current_frame % len(self.run_frames_right)]
-            elif self.velocity_x < 0:
-                self.facing_right = False
-                self.image = self.run_frames_left[self.current_frame % len(self.run_frames_left)]
-            else:
-                # Idle animation
-                self.image = self.idle_frames[self.current_frame % len(self.idle_frames)]
-                if not self.facing_right:
-                    self.image = pygame.transform.flip(self.idle_frames[self.current_frame % len(self.idle_frames)], True, False)
+            self.update_animation_frame(settle=True)
+    
+    def update_animation_frame(self, settle=False):
+        """
+        Set the animation frame for the current movement state.
+        
+        Movement states have different masks, so the preferred frame can
+        overlap a platform the last one was clear of. Such a frame is passed
+        over for the other of the ground and jump frames. The choice only
+        depends on the player's state and position, so restoring a snapshot
+        shows the same frame.
+        
+        Args:
+            settle (bool): On the ground, push an overlapping frame up out of
+                the platform instead of passing it over, then probe the
+                ground one pixel below with the chosen frame
+        """
+        if not self.using_sprites:
+            return
+        
+        if self.velocity_x > 0:
+            self.facing_right = True
+            ground_image = self.run_frames_right[self.current_frame % len(self.run_frames_right)]
+        elif self.velocity_x < 0:
+            self.facing_right = False
+            ground_image = self.run_frames_left[self.current_frame % len(self.run_frames_left)]
+        else:
+            # Idle animation
+            frames = self.idle_frames if self.facing_right else self.idle_frames_left
+            ground_image = frames[self.current_frame % len(frames)]
+        
+        # Prefer the jump frame when rising, or once falling for more than a
+        # frame, so a single frame without ground contact doesn't flicker it
+        air_image = self.jump_frame if self.facing_right else self.jump_frame_left
+        if not self.on_ground and (self.velocity_y < 0 or self.velocity_y > self.GRAVITY):
+            candidates = (air_image, ground_image)
+        else:
+            candidates = (ground_image, air_image)
+        
+        for image in candidates:
+            self.set_image(image)
+            if not self.hits_platform():
+                break
+            if settle and self.on_ground and self.push_out_of_platform():
+                break
+        
+        if settle and self.on_ground:
+            self.rect.y += 1
+            self.on_ground = self.hits_platform()
+            self.rect.y -= 1
+            self.sync_collision_rect()
+    
+    def push_out_of_platform(self):
+        """
+        Move up out of the platform the current frame overlaps.
+        
+        Returns:
+            bool: True if clear within MAX_PENETRATION pixels, otherwise the
+                position is left unchanged
+        """
+        original_y = self.rect.y
+        for _ in range(self.MAX_PENETRATION):
+            self.rect.y -= 1
+            if not self.hits_platform():
+                return True
+        self.rect.y = original_y
+        self.sync_collision_rect()
+        return False
         
     def jump(self):
         if self.on_ground:
@@ -7,16 +7,42 @@ sets up the game world, and manages the main game loop.
 Usage:
     Run this file directly to start the game:
     $ python main.py
+    
+    Host a two player game, or join one:
+    $ python main.py --host 47800
+    $ python main.py --join 192.168.1.20:47800
+    
+    Report import and initialization times up to the first menu frame:
+    $ python main.py --trace-startup
+    
+    Play an endless procedurally generated level, optionally with a fixed seed:
+    $ python main.py --endless --seed 42
+    
+    Report per-frame allocations and top allocation sites every 300 frames:
+    $ python main.py --trace-allocations 300
 """
 
 
 # Imports
-import pygame
 import sys
 import os
-from entities.player import Player
-from world.game_platform import Platform
+import argparse
+from startup_trace import startup_trace
+
+# Start the startup trace before anything heavy is imported
+startup_trace.start()
+
+import pygame
+from utils.fonts import get_font
 from world.start_screen import StartScreen
+from net.protocol import DEFAULT_PORT
+from utils.frame_gc import FrameGC, AllocationTracker
+
+# Gameplay modules (player, particles, networking, ...) are imported when a
+# level is first started, so they don't slow down reaching the start menu
+
+# File the rewind history is saved to and loaded from
+SNAPSHOT_FILE = 'snapshot.dys'
 
 
 # Setup game display
@@ -59,8 +85,9 @@ def load_game_background(width, height):
         pygame.Surface or None: The scaled background image, or None if loading failed
     """
     try:
-        background_img = pygame.image.load(os.path.join('assets', 'background.png')).convert()
-        return pygame.transform.scale(background_img, (width, height))
+        # Scale before converting so only the screen-sized copy is converted
+        background_img = pygame.image.load(os.path.join('assets', 'background.png'))
+        return pygame.transform.scale(background_img, (width, height)).convert()
     except Exception:
         return None
 
@@ -77,6 +104,8 @@ def create_platforms(screen_height, screen_width):
     Returns:
         tuple: (all_sprites, platforms) pygame.sprite.Group objects
     """
+    from world.game_platform import Platform
+    
     # Create sprite groups
     all_sprites = pygame.sprite.Group()
     platforms = pygame.sprite.Group()
@@ -101,15 +130,18 @@ def create_platforms(screen_height, screen_width):
 
 
 # Handle events
-def handle_events(player):
+def handle_events(player, collectibles=None):
     """
     Process all game events.
     
     Args:
         player (Player): The player object to control
+        collectibles (CollectibleSystem, optional): Used to fire projectiles
         
     Returns:
-        str: 'quit' to exit program, 'menu' to return to menu, or None to continue
+        str: 'quit' to exit program, 'menu' to return to menu, 'restart' to
+            restart the level, 'save'/'load' to save or load the rewind history,
+            'rewind' to step back in time, or None to continue
     """
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -118,8 +150,16 @@ def handle_events(player):
         if event.type == pygame.KEYDOWN:
             if event.key in (pygame.K_UP, pygame.K_w, pygame.K_SPACE):
                 player.jump()
+            elif event.key == pygame.K_f and collectibles:
+                collectibles.fire_from(player)
             elif event.key == pygame.K_ESCAPE:
                 return 'menu'
+            elif event.key == pygame.K_BACKSPACE:
+                return 'restart'
+            elif event.key == pygame.K_F5:
+                return 'save'
+            elif event.key == pygame.K_F9:
+                return 'load'
     
     # Handle player movement
     keys = pygame.key.get_pressed()
@@ -129,12 +169,17 @@ def handle_events(player):
         player.go_right()
     else:
         player.stop()
+    
+    # Hold R to rewind time
+    if keys[pygame.K_r]:
+        return 'rewind'
         
     return None
 
 
 # Main game loop
-def run_game_loop(screen, screen_width, screen_height):
+def run_game_loop(screen, screen_width, screen_height, network=None, frame_gc=None,
+                  allocations=None, max_frames=None, endless=False, seed=None):
     """
     Run the main gameplay loop.
     
@@ -142,13 +187,30 @@ def run_game_loop(screen, screen_width, screen_height):
         screen (pygame.Surface): The display surface
         screen_width (int): Width of the game window
         screen_height (int): Height of the game window
+        network (tuple, optional): ('host' or 'join', (host, port)) for
+            networked play
+        frame_gc (FrameGC, optional): Collects garbage between frames
+        allocations (AllocationTracker, optional): Started tracker that
+            records per-frame allocations
+        max_frames (int, optional): Return to the menu after this many frames
+        endless (bool): Play an endless generated level instead of the fixed one
+        seed (int, optional): Seed of the endless level, random if None
         
     Returns:
         str: 'quit' to exit program, 'menu' to return to menu
     """
+    from utils.render_target import RenderTarget, ResolutionGovernor, CameraView
+    from entities.player import Player
+    from entities.collectibles import CollectibleSystem
+    from world.particles import ParticleSystem, SPARK, create_environment_emitters
+    from world.bvh import BVH
+    from world.endless_level import EndlessLevel
+    from world.snapshot import WorldSnapshot, RewindBuffer
+    from net.session import NetworkSession
 
     # Pause menu music
-    pygame.mixer.music.pause()
+    if pygame.mixer.get_init():
+        pygame.mixer.music.pause()
 
     # Colors
     BLACK = (0, 0, 0)
@@ -157,20 +219,82 @@ def run_game_loop(screen, screen_width, screen_height):
     background_img = load_game_background(screen_width, screen_height)
     
     # Create platforms and sprite groups
-    all_sprites, platforms = create_platforms(screen_height, screen_width)
+    if endless:
+        all_sprites, platforms = pygame.sprite.Group(), pygame.sprite.Group()
+    else:
+        all_sprites, platforms = create_platforms(screen_height, screen_width)
     
     # Create player
     player = Player(100, 100, platforms, screen_width, screen_height)
     all_sprites.add(player)
     
+    # Index the level's solids for ray and line-of-sight queries. Endless
+    # levels change as they scroll and only keep a few platforms loaded, so
+    # they are tested directly
+    solids = None if endless else BVH(platforms)
+    
+    # Create pooled collectibles and projectiles
+    collectibles = CollectibleSystem(platforms, screen_width, screen_height, solids)
+    score_text = None
+    score_value = None
+    
+    # Generate the endless level ahead of the player, or fill the fixed one with coins
+    endless_level = None
+    distance_text = None
+    distance_value = None
+    if endless:
+        endless_level = EndlessLevel(player, platforms, screen_width, screen_height, seed,
+                                     collectibles)
+        print(f"Endless level seed: {endless_level.seed}")
+    else:
+        collectibles.place_on_platforms()
+    
+    # Create environmental particle effects
+    particles = ParticleSystem(screen_width, screen_height)
+    create_environment_emitters(particles, screen_width, screen_height)
+    
+    # Draw the world to an internal render target whose resolution follows frame time
+    render_target = RenderTarget(screen)
+    governor = ResolutionGovernor(render_target)
+    
+    # Endless levels are drawn through a view that scrolls with the player
+    world_view = render_target
+    if endless_level:
+        world_view = CameraView(render_target)
+    
+    # Record world state every tick for rewind, and keep the starting state for restart
+    snapshot = WorldSnapshot(player, collectibles)
+    rewind_buffer = RewindBuffer(snapshot)
+    level_start = snapshot.new_record()
+    snapshot.write(level_start)
+    rewind_buffer.record()
+    
+    # Networked play: the server is authoritative over player movement
+    session = None
+    if network:
+        session = NetworkSession(network[0], network[1], platforms, screen_width, screen_height)
+        session.attach(player)
+    
+    # Text that never changes is rendered once
+    hint_font = get_font(24)
+    hint_text = hint_font.render("Press ESC to return to menu", True, (255, 255, 255))
+    
+    # The level is loaded: freeze it and collect garbage only between frames
+    if frame_gc:
+        frame_gc.start()
+    
     # Game loop
     clock = pygame.time.Clock()
     running = True
     result = 'menu'  # Default return to menu
+    frame_number = 0
     
     while running:
+        if allocations:
+            allocations.begin_frame()
+        
         # Process events
-        event_result = handle_events(player)
+        event_result = handle_events(player, collectibles)
         
         if event_result == 'quit':
             result = 'quit'
@@ -180,52 +304,170 @@ def run_game_loop(screen, screen_width, screen_height):
             running = False
         
         # Update game state
-        all_sprites.update()
+        if session or endless_level:
+            # Time controls would desync the local player from the server,
+            # or take it back to chunks that have been recycled
+            if event_result in ('rewind', 'restart', 'load'):
+                event_result = None
+        if session:
+            input_bits = session.read_input(player)
+        
+        if event_result == 'rewind':
+            rewind_buffer.rewind()
+        elif event_result == 'restart':
+            snapshot.read(level_start)
+            rewind_buffer.clear()
+            rewind_buffer.record()
+        elif event_result == 'load':
+            try:
+                rewind_buffer.load(SNAPSHOT_FILE)
+            except (OSError, ValueError) as e:
+                print(f"Could not load snapshot: {e}")
+        else:
+            if event_result == 'save':
+                try:
+                    rewind_buffer.save(SNAPSHOT_FILE)
+                except OSError as e:
+                    print(f"Could not save snapshot: {e}")
+            all_sprites.update()
+            collectibles.update(player)
+            rewind_buffer.record()
+        
+        if endless_level:
+            endless_level.update()
         
-        # Draw everything
+        if session:
+            session.update(player, input_bits)
+        
+        # Split the frame into phases so churn in one isn't hidden by another
+        if allocations:
+            allocations.mark()
+        
+        # Particles are drawn in screen coordinates
+        camera_x = endless_level.camera_x if endless_level else 0
+        for x, y in collectibles.impacts:
+            particles.burst(SPARK, x - camera_x, y)
+        particles.update()
+        if allocations:
+            allocations.mark()
+        
+        # Draw the world at the internal resolution
         if background_img:
-            screen.blit(background_img, (0, 0))
+            render_target.blit(background_img, (0, 0))
         else:
-            screen.fill(BLACK)
+            render_target.fill(BLACK)
+        
+        if endless_level:
+            world_view.x = camera_x
+            world_view.draw_group(platforms)
+        world_view.draw_group(all_sprites)
+        if session:
+            render_target.draw_group(session.remote_sprites)
+        collectibles.draw(world_view)
+        particles.draw(render_target.surface, render_target.scale)
+        if allocations:
+            allocations.mark()
         
-        all_sprites.draw(screen)
+        # Scale the world up to the window, then draw the HUD at full resolution
+        render_target.present()
         
         # Add ESC key hint
-        hint_font = pygame.font.Font(None, 24)
-        hint_text = hint_font.render("Press ESC to return to menu", True, (255, 255, 255))
         screen.blit(hint_text, (10, 10))
         
+        # Show money collected, only re-rendering when it changes
+        if score_value != collectibles.score:
+            score_value = collectibles.score
+            score_text = hint_font.render(f"Money: {score_value}", True, (255, 215, 0))
+        screen.blit(score_text, score_text.get_rect(topright=(screen_width - 10, 10)))
+        
+        # Show how far the player has got in an endless level
+        if endless_level:
+            if distance_value != endless_level.distance // 50:
+                distance_value = endless_level.distance // 50
+                distance_text = hint_font.render(f"Distance: {distance_value} m", True,
+                                                 (255, 255, 255))
+            screen.blit(distance_text, distance_text.get_rect(topright=(screen_width - 10, 40)))
+        
         # Uncomment to debug collision boxes
         #player.draw_collision_box(screen)
     
         # Update display
         pygame.display.flip()
         
+        # Between frames: collect garbage while the frame limiter would be waiting
+        if allocations:
+            allocations.end_frame()
+        if frame_gc:
+            frame_gc.collect()
+        
         # Control game speed
         clock.tick(60)
         
+        # Adjust internal resolution from the time spent on this frame
+        governor.update(clock.get_rawtime())
+        
+        frame_number += 1
+        if max_frames and frame_number >= max_frames:
+            running = False
+    
+    if session:
+        session.close()
+    
+    if endless_level:
+        endless_level.close()
+        print(f"endless level: {endless_level.get_stats()}")
+    
+    if frame_gc:
+        frame_gc.stop()
+        print(f"frame gc: {frame_gc.get_stats()}")
+    
+    # Report pool usage for tuning the pool sizes
+    for name, stats in collectibles.get_stats().items():
+        print(f"{name} pool: {stats}")
+        
     return result
 
 
-def run_game():
+def run_game(network=None, frame_gc=True, trace_allocations=0, endless=False, seed=None):
     """
     Initialize and run the game with start screen.
     
     This function contains the complete game lifecycle, from initialization
     to the main loop and cleanup.
+    
+    Args:
+        network (tuple, optional): ('host' or 'join', (host, port)) for
+            networked play
+        frame_gc (bool): Freeze the level after loading and only collect
+            garbage between frames
+        trace_allocations (int): Report allocations every this many frames,
+            0 to disable
+        endless (bool): Play an endless generated level
+        seed (int, optional): Seed of the endless level, random if None
     """
-    # Initialize pygame
-    pygame.init()
+    # Initialize only the display here, fonts and audio start on first use
+    with startup_trace.step('pygame.display.init'):
+        pygame.display.init()
     
     # Game constants
     SCREEN_WIDTH = 800
     SCREEN_HEIGHT = 600
     
     # Set up the display
-    screen = setup_display(SCREEN_WIDTH, SCREEN_HEIGHT, "Dystopia")
+    with startup_trace.step('setup_display'):
+        screen = setup_display(SCREEN_WIDTH, SCREEN_HEIGHT, "Dystopia")
     
     # Create start screen
-    start_screen = StartScreen(SCREEN_WIDTH, SCREEN_HEIGHT)
+    with startup_trace.step('StartScreen'):
+        start_screen = StartScreen(SCREEN_WIDTH, SCREEN_HEIGHT)
+    first_frame = True
+    
+    # Garbage collection between frames and allocation tracking for gameplay
+    frame_collector = FrameGC() if frame_gc else None
+    allocation_tracker = None
+    if trace_allocations:
+        allocation_tracker = AllocationTracker(trace_allocations)
+        allocation_tracker.start()
     
     # Game states
     MENU = 0
@@ -250,7 +492,7 @@ def run_game():
         if previous_state != game_state:
             if game_state == MENU:
                 # Potentially restart menu music if it was stopped
-                if not pygame.mixer.music.get_busy() and start_screen.music_playing:
+                if start_screen.music_playing and not pygame.mixer.music.get_busy():
                     pygame.mixer.music.unpause()
             
             previous_state = game_state
@@ -270,7 +512,9 @@ def run_game():
             
         elif game_state == PLAYING:
             # Run the main gameplay loop and get the result
-            result = run_game_loop(screen, SCREEN_WIDTH, SCREEN_HEIGHT)
+            result = run_game_loop(screen, SCREEN_WIDTH, SCREEN_HEIGHT, network,
+                                   frame_collector, allocation_tracker,
+                                   endless=endless, seed=seed)
             
             if result == 'quit':
                 running = False
@@ -286,7 +530,7 @@ def run_game():
             
             # Draw a simple options screen placeholder
             screen.fill((50, 50, 50))
-            font = pygame.font.Font(None, 50)
+            font = get_font(50)
             text = font.render("Options Menu (Coming Soon)", True, (255, 255, 255))
             text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
             screen.blit(text, text_rect)
@@ -298,13 +542,65 @@ def run_game():
         # Update display
         pygame.display.flip()
         
+        # The menu is up, now do the startup work that could wait
+        if first_frame:
+            first_frame = False
+            startup_trace.first_frame()
+            start_screen.start_music()
+        
         # Control menu animation speed
         clock.tick(60)
     
     # Clean up
+    if allocation_tracker:
+        allocation_tracker.stop()
     pygame.quit()
     sys.exit()
 
 
+# Parse command line arguments
+def parse_args(argv=None):
+    """
+    Parse the command line options.
+    
+    Args:
+        argv (list, optional): Arguments to parse, defaults to sys.argv
+        
+    Returns:
+        dict: Keyword arguments for run_game()
+    """
+    parser = argparse.ArgumentParser(description="Dystopia")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--host', type=int, nargs='?', const=DEFAULT_PORT, metavar='PORT',
+                       help="host a two player game")
+    group.add_argument('--join', metavar='HOST[:PORT]', help="join a hosted game")
+    group.add_argument('--endless', action='store_true',
+                       help="play an endless procedurally generated level")
+    parser.add_argument('--seed', type=int, help="seed of the endless level")
+    parser.add_argument('--trace-startup', action='store_true',
+                        help="report import and initialization times up to the first menu frame")
+    parser.add_argument('--no-frame-gc', action='store_true',
+                        help="let Python collect garbage at any time instead of between frames")
+    parser.add_argument('--trace-allocations', type=int, nargs='?', const=300, default=0,
+                        metavar='FRAMES',
+                        help="report per-frame allocations and top allocation sites")
+    args = parser.parse_args(argv)
+    
+    network = None
+    if args.host is not None:
+        network = ('host', ('0.0.0.0', args.host))
+    elif args.join:
+        host, _, port = args.join.partition(':')
+        network = ('join', (host, int(port) if port else DEFAULT_PORT))
+    
+    return {
+        'network': network,
+        'frame_gc': not args.no_frame_gc,
+        'trace_allocations': args.trace_allocations,
+        'endless': args.endless,
+        'seed': args.seed,
+    }
+
+
 if __name__ == "__main__":
-    run_game()
\ No newline at end of file
+    run_game(**parse_args())
\ No newline at end of file
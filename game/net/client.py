@@ -0,0 +1,196 @@
+"""
+Dystopia - Game Client Module
+
+This module connects to a GameServer, sends the local player's inputs and
+keeps the local Player responsive with client-side prediction. When a
+server snapshot arrives the player is reset to the authoritative state and
+the inputs the server has not processed yet are replayed on top of it.
+"""
+
+import collections
+import math
+import socket
+import struct
+import time
+from net.protocol import (
+    HELLO, WELCOME, SNAPSHOT, BYE, PACKET_TYPE, WELCOME_PACKET, HISTORY_LENGTH,
+    apply_input, apply_player_state, encode_input, decode_snapshot,
+)
+from net.transport import Transport
+
+# Most unacknowledged inputs resent with every input packet
+MAX_RESENT_INPUTS = 32
+
+
+class GameClient:
+    """Client side of a networked game with prediction and reconciliation."""
+
+    def __init__(self, server_address, conditions=None, clock=time.monotonic, hello_interval=0.25):
+        """
+        Args:
+            server_address (tuple): (host, port) of the server
+            conditions (NetworkConditions, optional): Simulated network conditions
+            clock (callable): Returns the current time in seconds
+            hello_interval (float): Seconds between connection attempts
+        """
+        # Resolve the host so it matches the address packets arrive from
+        host, port = server_address
+        self.server_address = (socket.gethostbyname(host), port)
+        self.clock = clock
+        self.hello_interval = hello_interval
+        self.transport = Transport(('0.0.0.0', 0), conditions, clock)
+
+        self.player = None
+        self.player_id = None
+        self.spawn = None
+        self._last_hello = None
+
+        # Decoded world states by tick, kept as bases for delta snapshots
+        self.states = {}
+        self.latest_tick = 0
+        self.world_state = {}
+
+        # Inputs not yet acknowledged: (seq, bits, predicted x, predicted y)
+        self.input_seq = 0
+        self.pending = collections.deque()
+
+        self.snapshots_received = 0
+        self.corrections = 0
+        self.correction_distance = 0.0
+
+    @property
+    def connected(self):
+        return self.player_id is not None
+
+    def attach(self, player):
+        """
+        Set the local Player that is predicted and reconciled.
+
+        Args:
+            player (Player): The locally controlled player
+        """
+        self.player = player
+        if self.spawn is not None:
+            self._place_at_spawn()
+
+    def _place_at_spawn(self):
+        self.player.rect.x, self.player.rect.y = self.spawn
+        self.player.velocity_x = 0
+        self.player.velocity_y = 0
+        self.player.sync_collision_rect()
+
+    def send_input(self, bits):
+        """
+        Record and send one tick of input that has already been applied to
+        the local player.
+
+        Args:
+            bits (int): Input bits applied this tick
+        """
+        if not self.connected:
+            return
+
+        self.input_seq += 1
+        self.pending.append((self.input_seq, bits, self.player.rect.x, self.player.rect.y))
+        if len(self.pending) > MAX_RESENT_INPUTS:
+            self.pending.popleft()
+
+        entries = [(seq, input_bits) for seq, input_bits, _, _ in self.pending]
+        self.transport.send(encode_input(self.latest_tick, entries), self.server_address)
+
+    def receive(self):
+        """Process packets from the server and reconcile the local player."""
+        now = self.clock()
+        if not self.connected and (self._last_hello is None
+                                   or now - self._last_hello >= self.hello_interval):
+            self._last_hello = now
+            self.transport.send(PACKET_TYPE.pack(HELLO), self.server_address)
+
+        for data, address in self.transport.receive():
+            if address != self.server_address or not data:
+                continue
+            try:
+                self._handle_packet(data)
+            except (struct.error, ValueError):
+                # Malformed packet, drop it
+                continue
+
+    def _handle_packet(self, data):
+        packet_type = PACKET_TYPE.unpack_from(data)[0]
+
+        if packet_type == WELCOME and not self.connected:
+            if len(data) != WELCOME_PACKET.size:
+                raise ValueError("Welcome packet has the wrong length")
+            _, player_id, x, y, _ = WELCOME_PACKET.unpack(data)
+            self.player_id = player_id
+            self.spawn = (x, y)
+            if self.player is not None:
+                self._place_at_spawn()
+
+        elif packet_type == SNAPSHOT and self.connected:
+            self._handle_snapshot(data)
+
+    def _handle_snapshot(self, data):
+        decoded = decode_snapshot(data, self.states)
+        if decoded is None:
+            # Base state already discarded, wait for a snapshot we can decode
+            return
+        tick, state, last_input_seq = decoded
+        if tick <= self.latest_tick:
+            # Arrived out of order
+            return
+
+        self.snapshots_received += 1
+        self.states[tick] = state
+        for old_tick in [t for t in self.states if t <= tick - HISTORY_LENGTH]:
+            del self.states[old_tick]
+        self.latest_tick = tick
+        self.world_state = state
+
+        own_state = state.get(self.player_id)
+        if own_state is not None and self.player is not None:
+            self._reconcile(own_state, last_input_seq)
+
+    def _reconcile(self, own_state, last_input_seq):
+        # Drop inputs the server has processed, remembering where we
+        # predicted the player would be after the last of them
+        predicted = None
+        while self.pending and self.pending[0][0] <= last_input_seq:
+            seq, _, x, y = self.pending.popleft()
+            if seq == last_input_seq:
+                predicted = (x, y)
+
+        server_x, server_y = own_state[0], own_state[1]
+        if predicted is not None and predicted != (server_x, server_y):
+            self.corrections += 1
+            self.correction_distance += math.hypot(predicted[0] - server_x, predicted[1] - server_y)
+
+        # Rewind to the authoritative state and replay unprocessed inputs
+        player = self.player
+        apply_player_state(player, own_state)
+        for _, bits, _, _ in self.pending:
+            apply_input(player, bits)
+            player.update()
+
+    def remote_states(self):
+        """Get the latest states of every other player, keyed by player id."""
+        return {player_id: values for player_id, values in self.world_state.items()
+                if player_id != self.player_id}
+
+    def get_stats(self):
+        transport = self.transport
+        return {
+            'connected': self.connected,
+            'snapshots': self.snapshots_received,
+            'bytes_sent': transport.bytes_sent,
+            'bytes_received': transport.bytes_received,
+            'corrections': self.corrections,
+            'mean_correction': (self.correction_distance / self.corrections
+                                if self.corrections else 0.0),
+        }
+
+    def disconnect(self):
+        if self.connected:
+            self.transport.send(PACKET_TYPE.pack(BYE), self.server_address)
+            self.transport.flush()
+        self.transport.close()
@@ -0,0 +1,159 @@
+"""
+Dystopia - Network Test Harness
+
+Runs a server and several bot-controlled clients in one process over
+localhost UDP with simulated latency, jitter and packet loss, and reports
+bandwidth per client and how well client-side prediction held up.
+
+Usage:
+    Run from the game directory:
+    $ python -m net.harness --latency 0 50 100 200 --loss 0.02 --seconds 10
+"""
+
+import argparse
+import os
+import random
+import pygame
+from entities.player import Player
+from net.client import GameClient
+from net.protocol import INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, apply_input, quantize_player
+from net.server import GameServer
+from net.transport import NetworkConditions
+
+# Approximate IPv4 + UDP header bytes per packet, for on-the-wire bandwidth
+UDP_OVERHEAD = 28
+
+
+class SimulatedClock:
+    """Clock advanced by the harness, so a run doesn't take real time."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def bot_input(rng, bits):
+    """Pick the next input for a bot: mostly keep going, sometimes turn or jump."""
+    if rng.random() < 0.03:
+        bits = rng.choice((0, INPUT_LEFT, INPUT_RIGHT))
+    bits &= ~INPUT_JUMP
+    if rng.random() < 0.02:
+        bits |= INPUT_JUMP
+    return bits
+
+
+def run_trial(platforms, screen_width, screen_height, latency_ms=0, jitter_ms=0, loss=0.0,
+              seconds=10, clients=2, fps=60, seed=1):
+    """
+    Run one simulated session and collect its statistics.
+
+    Args:
+        platforms (pygame.sprite.Group): The level's platforms
+        screen_width (int): Width of the level
+        screen_height (int): Height of the level
+        latency_ms (float): Simulated round trip time
+        jitter_ms (float): Simulated round trip jitter
+        loss (float): Packet loss probability in each direction
+        seconds (float): Simulated duration of the session
+        clients (int): Number of bot clients
+        fps (int): Simulation tick rate
+        seed (int): Seed for bots and network conditions
+
+    Returns:
+        dict: Per-client and server statistics
+    """
+    clock = SimulatedClock()
+
+    def conditions(offset):
+        # Half of the round trip in each direction
+        return NetworkConditions(latency_ms / 2, jitter_ms / 2, loss, seed + offset)
+
+    server = GameServer(platforms, screen_width, screen_height,
+                        conditions=conditions(0), clock=clock)
+    bots = []
+    for i in range(clients):
+        client = GameClient(server.address, conditions=conditions(i + 1), clock=clock)
+        player = Player(100, 100, platforms, screen_width, screen_height)
+        client.attach(player)
+        bots.append((client, player, random.Random(seed + 100 + i)))
+
+    ticks = int(seconds * fps)
+    bits = [0] * clients
+    for tick in range(ticks):
+        clock.advance(1 / fps)
+        for i, (client, player, rng) in enumerate(bots):
+            if client.connected:
+                bits[i] = bot_input(rng, bits[i])
+                apply_input(player, bits[i])
+                player.update()
+                client.send_input(bits[i])
+        server.step()
+        for client, _, _ in bots:
+            client.receive()
+
+    # Stop sending input and let everything in flight arrive
+    for _ in range(int(fps * (latency_ms + jitter_ms) / 1000) + fps):
+        clock.advance(1 / fps)
+        server.step()
+        for client, _, _ in bots:
+            client.receive()
+
+    server_players = {c.player_id: c.player for c in server.clients.values()}
+    results = []
+    for client, player, _ in bots:
+        stats = client.get_stats()
+        transport = client.transport
+        stats['up_kbps'] = (transport.bytes_sent + UDP_OVERHEAD * transport.packets_sent) * 8 / seconds / 1000
+        stats['down_kbps'] = (transport.bytes_received + UDP_OVERHEAD * transport.packets_received) * 8 / seconds / 1000
+        stats['payload_down_bytes_per_tick'] = transport.bytes_received / ticks
+        server_player = server_players.get(client.player_id)
+        stats['in_sync'] = (server_player is not None
+                            and quantize_player(server_player) == quantize_player(player))
+        results.append(stats)
+
+    for client, _, _ in bots:
+        client.disconnect()
+    server_stats = server.get_stats()
+    server.close()
+    return {'clients': results, 'server': server_stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure networked play over localhost.")
+    parser.add_argument('--latency', type=float, nargs='+', default=[0, 50, 100, 200],
+                        help="round trip latencies to test, in ms")
+    parser.add_argument('--jitter', type=float, default=10, help="round trip jitter in ms")
+    parser.add_argument('--loss', type=float, default=0.02, help="packet loss probability")
+    parser.add_argument('--seconds', type=float, default=10, help="simulated seconds per trial")
+    parser.add_argument('--clients', type=int, default=2, help="number of clients")
+    args = parser.parse_args()
+
+    # Players load their sprites, which needs a display surface
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+
+    from main import create_platforms
+    screen_width, screen_height = 800, 600
+    _, platforms = create_platforms(screen_height, screen_width)
+
+    print(f"{'RTT ms':>7} {'client':>6} {'up kbps':>8} {'down kbps':>9} "
+          f"{'B/tick':>7} {'corrections':>11} {'mean err px':>11} {'in sync':>7}")
+    for latency in args.latency:
+        result = run_trial(platforms, screen_width, screen_height, latency, args.jitter,
+                           args.loss, args.seconds, args.clients)
+        for i, stats in enumerate(result['clients']):
+            print(f"{latency:>7.0f} {i:>6} {stats['up_kbps']:>8.1f} {stats['down_kbps']:>9.1f} "
+                  f"{stats['payload_down_bytes_per_tick']:>7.1f} {stats['corrections']:>11} "
+                  f"{stats['mean_correction']:>11.1f} {str(stats['in_sync']):>7}")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Dystopia - Network Protocol Module
+
+This module defines the UDP packet formats used between the game server
+and clients, the quantized player state that is sent over the wire, and
+the delta compression of world snapshots against a state the client has
+already acknowledged.
+"""
+
+import struct
+
+# Port used when hosting or joining without one
+DEFAULT_PORT = 47800
+
+# Packet types
+HELLO = 0
+WELCOME = 1
+INPUT = 2
+SNAPSHOT = 3
+BYE = 4
+
+PACKET_TYPE = struct.Struct('<B')
+
+# type, player id, spawn x, spawn y, server tick
+WELCOME_PACKET = struct.Struct('<BBhhI')
+
+# type, last snapshot tick received, number of input entries
+INPUT_HEADER = struct.Struct('<BIB')
+# input sequence number, input bits
+INPUT_ENTRY = struct.Struct('<IB')
+
+# type, tick, base tick (0 for a full snapshot), last input processed, entity count
+SNAPSHOT_HEADER = struct.Struct('<BIIIB')
+# player id, changed field mask
+ENTITY_HEADER = struct.Struct('<BB')
+
+# Input bits
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4
+
+# Quantized player state fields and their wire formats:
+# x, y (int16), velocity x/y (int8), flags, animation frame and timer
+STATE_FIELDS = ('h', 'h', 'b', 'b', 'B', 'B')
+FULL_MASK = (1 << len(STATE_FIELDS)) - 1
+REMOVED = 0x80
+
+# Player state flag bits
+ON_GROUND = 1
+FACING_RIGHT = 2
+
+# How many ticks of history are kept for delta compression
+HISTORY_LENGTH = 64
+
+# Structs for every combination of changed fields, built on demand
+_field_structs = {}
+
+
+def _get_field_struct(mask):
+    field_struct = _field_structs.get(mask)
+    if field_struct is None:
+        codes = ''.join(code for i, code in enumerate(STATE_FIELDS) if mask & (1 << i))
+        field_struct = _field_structs[mask] = struct.Struct('<' + codes)
+    return field_struct
+
+
+def _clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+def quantize_player(player):
+    """
+    Capture the networked state of a player as a tuple of small integers.
+
+    Args:
+        player (Player): The player to capture
+
+    Returns:
+        tuple: (x, y, velocity_x, velocity_y, flags, animation)
+    """
+    flags = 0
+    if player.on_ground:
+        flags |= ON_GROUND
+    if player.facing_right:
+        flags |= FACING_RIGHT
+    animation = (player.current_frame & 0x0F) | ((player.animation_timer & 0x0F) << 4)
+    return (
+        _clamp(player.rect.x, -32768, 32767),
+        _clamp(player.rect.y, -32768, 32767),
+        _clamp(player.velocity_x, -128, 127),
+        _clamp(player.velocity_y, -128, 127),
+        flags,
+        animation,
+    )
+
+
+def apply_player_state(player, state):
+    """
+    Set a player to a state captured with quantize_player().
+
+    Args:
+        player (Player): The player to update
+        state (tuple): The quantized state
+    """
+    x, y, velocity_x, velocity_y, flags, animation = state
+    player.rect.x = x
+    player.rect.y = y
+    player.velocity_x = velocity_x
+    player.velocity_y = velocity_y
+    player.on_ground = bool(flags & ON_GROUND)
+    player.facing_right = bool(flags & FACING_RIGHT)
+    player.current_frame = animation & 0x0F
+    player.animation_timer = animation >> 4
+    player.update_animation_frame()
+    player.sync_collision_rect()
+
+
+def apply_input(player, bits):
+    """
+    Apply one tick of input to a player, the same way handle_events does.
+
+    Args:
+        player (Player): The player to control
+        bits (int): Combination of INPUT_LEFT, INPUT_RIGHT and INPUT_JUMP
+    """
+    if bits & INPUT_JUMP:
+        player.jump()
+    if bits & INPUT_LEFT:
+        player.go_left()
+    elif bits & INPUT_RIGHT:
+        player.go_right()
+    else:
+        player.stop()
+
+
+def input_from_player(player):
+    """
+    Read the input applied to a player this tick, before it is updated.
+
+    jump() sets velocity_y to exactly -JUMP_POWER, a value an update never
+    leaves behind, so it identifies a jump made this tick.
+
+    Args:
+        player (Player): The player after event handling
+
+    Returns:
+        int: Input bits
+    """
+    bits = 0
+    if player.velocity_x < 0:
+        bits |= INPUT_LEFT
+    elif player.velocity_x > 0:
+        bits |= INPUT_RIGHT
+    if player.velocity_y == -player.JUMP_POWER:
+        bits |= INPUT_JUMP
+    return bits
+
+
+def encode_input(ack_tick, entries):
+    """
+    Build an input packet.
+
+    Args:
+        ack_tick (int): Latest snapshot tick the client has decoded
+        entries (list): (sequence, bits) pairs, oldest first
+
+    Returns:
+        bytes: The packet
+    """
+    parts = [INPUT_HEADER.pack(INPUT, ack_tick, len(entries))]
+    for seq, bits in entries:
+        parts.append(INPUT_ENTRY.pack(seq, bits))
+    return b''.join(parts)
+
+
+def decode_input(data):
+    """
+    Parse an input packet.
+
+    Returns:
+        tuple: (ack_tick, entries)
+
+    Raises:
+        ValueError: If the packet length doesn't match its entry count
+    """
+    if len(data) < INPUT_HEADER.size:
+        raise ValueError("Input packet too short")
+    _, ack_tick, count = INPUT_HEADER.unpack_from(data)
+    if len(data) != INPUT_HEADER.size + count * INPUT_ENTRY.size:
+        raise ValueError("Input packet length doesn't match its entry count")
+    entries = [INPUT_ENTRY.unpack_from(data, INPUT_HEADER.size + i * INPUT_ENTRY.size)
+               for i in range(count)]
+    return ack_tick, entries
+
+
+def encode_snapshot(tick, state, last_input_seq, base_tick=0, base=None):
+    """
+    Build a snapshot packet, delta compressed against a base state.
+
+    Only fields that differ from the base are sent. Entities missing from
+    the new state are sent as removed, unchanged entities are left out.
+
+    Args:
+        tick (int): Server tick of the state
+        state (dict): Maps player id to quantized player state
+        last_input_seq (int): Last input of the receiving client that is
+            included in this state
+        base_tick (int): Tick of the base state, 0 for a full snapshot
+        base (dict, optional): The base state the client already has
+
+    Returns:
+        bytes: The packet
+    """
+    if base is None:
+        base = {}
+        base_tick = 0
+
+    entities = []
+    for player_id, values in state.items():
+        old_values = base.get(player_id)
+        if old_values is None:
+            mask = FULL_MASK
+        else:
+            mask = 0
+            for i in range(len(values)):
+                if values[i] != old_values[i]:
+                    mask |= 1 << i
+            if not mask:
+                continue
+        changed = [value for i, value in enumerate(values) if mask & (1 << i)]
+        entities.append(ENTITY_HEADER.pack(player_id, mask) + _get_field_struct(mask).pack(*changed))
+
+    for player_id in base:
+        if player_id not in state:
+            entities.append(ENTITY_HEADER.pack(player_id, REMOVED))
+
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT, tick, base_tick, last_input_seq, len(entities))
+    return header + b''.join(entities)
+
+
+def decode_snapshot(data, states):
+    """
+    Parse a snapshot packet and rebuild the full state from its base.
+
+    Args:
+        data (bytes): The packet
+        states (dict): Previously decoded states by tick
+
+    Returns:
+        tuple or None: (tick, state, last_input_seq), or None if the base
+            state is no longer available
+
+    Raises:
+        ValueError: If the packet is shorter or longer than its entities
+    """
+    if len(data) < SNAPSHOT_HEADER.size:
+        raise ValueError("Snapshot packet too short")
+    _, tick, base_tick, last_input_seq, count = SNAPSHOT_HEADER.unpack_from(data)
+    if base_tick:
+        base = states.get(base_tick)
+        if base is None:
+            return None
+        state = dict(base)
+    else:
+        state = {}
+
+    offset = SNAPSHOT_HEADER.size
+    for _ in range(count):
+        if offset + ENTITY_HEADER.size > len(data):
+            raise ValueError("Snapshot packet truncated")
+        player_id, mask = ENTITY_HEADER.unpack_from(data, offset)
+        offset += ENTITY_HEADER.size
+        if mask == REMOVED:
+            state.pop(player_id, None)
+            continue
+
+        field_struct = _get_field_struct(mask)
+        if offset + field_struct.size > len(data):
+            raise ValueError("Snapshot packet truncated")
+        changed = iter(field_struct.unpack_from(data, offset))
+        offset += field_struct.size
+
+        old_values = state.get(player_id, (0,) * len(STATE_FIELDS))
+        state[player_id] = tuple(next(changed) if mask & (1 << i) else old_values[i]
+                                 for i in range(len(STATE_FIELDS)))
+
+    if offset != len(data):
+        raise ValueError("Snapshot packet has trailing data")
+    return tick, state, last_input_seq
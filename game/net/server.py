@@ -0,0 +1,153 @@
+"""
+Dystopia - Game Server Module
+
+This module runs the authoritative simulation for networked play. Each
+connected client controls one Player; the server applies their inputs in
+order and sends every client delta compressed snapshots of all players.
+"""
+
+import struct
+import time
+from entities.player import Player
+from net.protocol import (
+    HELLO, INPUT, BYE, PACKET_TYPE, WELCOME_PACKET, WELCOME, HISTORY_LENGTH,
+    quantize_player, apply_input, decode_input, encode_snapshot,
+)
+from net.transport import Transport
+
+
+class ClientConnection:
+    """Server-side record of one connected client."""
+
+    def __init__(self, player_id, address, player, now):
+        self.player_id = player_id
+        self.address = address
+        self.player = player
+        self.last_input_seq = 0
+        self.acked_tick = 0
+        self.last_heard = now
+
+
+class GameServer:
+    """Authoritative server for up to ``max_clients`` players in one level."""
+
+    def __init__(self, platforms, screen_width, screen_height, host='127.0.0.1', port=0,
+                 conditions=None, clock=time.monotonic, max_clients=4,
+                 snapshot_interval=1, timeout=5.0):
+        """
+        Args:
+            platforms (pygame.sprite.Group): The level's platforms
+            screen_width (int): Width of the level
+            screen_height (int): Height of the level
+            host (str): Address to listen on
+            port (int): Port to listen on, 0 picks a free port
+            conditions (NetworkConditions, optional): Simulated network conditions
+            clock (callable): Returns the current time in seconds
+            max_clients (int): Maximum number of connected players
+            snapshot_interval (int): Send a snapshot every this many ticks
+            timeout (float): Seconds of silence before a client is dropped
+        """
+        self.platforms = platforms
+        self.SCREEN_WIDTH = screen_width
+        self.SCREEN_HEIGHT = screen_height
+        self.clock = clock
+        self.max_clients = max_clients
+        self.snapshot_interval = snapshot_interval
+        self.timeout = timeout
+
+        self.transport = Transport((host, port), conditions, clock)
+        self.address = self.transport.address
+
+        self.clients = {}  # address -> ClientConnection
+        self.tick = 0
+        self.history = {}  # tick -> world state, for delta compression
+
+    def spawn_position(self, player_id):
+        return 100 + 80 * player_id, 100
+
+    def step(self):
+        """Process incoming packets, advance one tick and send snapshots."""
+        now = self.clock()
+        for data, address in self.transport.receive():
+            try:
+                self._handle_packet(data, address, now)
+            except (struct.error, ValueError):
+                # Malformed packet from a stray sender or broken client
+                continue
+
+        for address, client in list(self.clients.items()):
+            if now - client.last_heard > self.timeout:
+                del self.clients[address]
+
+        self.tick += 1
+        state = {client.player_id: quantize_player(client.player)
+                 for client in self.clients.values()}
+        self.history[self.tick] = state
+        self.history.pop(self.tick - HISTORY_LENGTH, None)
+
+        if self.tick % self.snapshot_interval == 0:
+            for client in self.clients.values():
+                base = self.history.get(client.acked_tick)
+                packet = encode_snapshot(self.tick, state, client.last_input_seq,
+                                         client.acked_tick, base)
+                self.transport.send(packet, client.address)
+
+    def _handle_packet(self, data, address, now):
+        if not data:
+            return
+        packet_type = PACKET_TYPE.unpack_from(data)[0]
+        client = self.clients.get(address)
+
+        if packet_type == HELLO:
+            if client is None:
+                client = self._add_client(address, now)
+                if client is None:
+                    return
+            client.last_heard = now
+            x, y = self.spawn_position(client.player_id)
+            self.transport.send(WELCOME_PACKET.pack(WELCOME, client.player_id, x, y, self.tick),
+                                address)
+
+        elif packet_type == INPUT and client is not None:
+            client.last_heard = now
+            ack_tick, entries = decode_input(data)
+            if ack_tick > client.acked_tick:
+                client.acked_tick = ack_tick
+
+            # Inputs are resent until acknowledged, so skip ones already applied.
+            # Each input advances the player exactly one tick, which keeps the
+            # client's prediction in step with the server.
+            for seq, bits in entries:
+                if seq > client.last_input_seq:
+                    apply_input(client.player, bits)
+                    client.player.update()
+                    client.last_input_seq = seq
+
+        elif packet_type == BYE and client is not None:
+            del self.clients[address]
+
+    def _add_client(self, address, now):
+        used_ids = {client.player_id for client in self.clients.values()}
+        free_ids = [i for i in range(self.max_clients) if i not in used_ids]
+        if not free_ids:
+            return None
+
+        player_id = free_ids[0]
+        x, y = self.spawn_position(player_id)
+        player = Player(x, y, self.platforms, self.SCREEN_WIDTH, self.SCREEN_HEIGHT)
+        client = ClientConnection(player_id, address, player, now)
+        self.clients[address] = client
+        return client
+
+    def get_stats(self):
+        transport = self.transport
+        return {
+            'clients': len(self.clients),
+            'tick': self.tick,
+            'bytes_sent': transport.bytes_sent,
+            'bytes_received': transport.bytes_received,
+            'packets_dropped': transport.packets_dropped,
+        }
+
+    def close(self):
+        self.transport.close()
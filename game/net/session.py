@@ -0,0 +1,84 @@
+"""
+Dystopia - Network Session Module
+
+This module ties the networking layer into the game loop. Hosting runs a
+GameServer in the same process and connects to it over loopback like any
+other client, so both players go through the same code path.
+"""
+
+import pygame
+from entities.player import Player
+from net.client import GameClient
+from net.protocol import apply_player_state, input_from_player
+from net.server import GameServer
+
+
+class NetworkSession:
+    """A local client, plus a server when hosting, for one level."""
+
+    def __init__(self, mode, address, platforms, screen_width, screen_height):
+        """
+        Args:
+            mode (str): 'host' to run the server, 'join' to connect to one
+            address (tuple): (host, port) to listen on or connect to
+            platforms (pygame.sprite.Group): The level's platforms
+            screen_width (int): Width of the level
+            screen_height (int): Height of the level
+        """
+        self.platforms = platforms
+        self.SCREEN_WIDTH = screen_width
+        self.SCREEN_HEIGHT = screen_height
+
+        self.server = None
+        if mode == 'host':
+            self.server = GameServer(platforms, screen_width, screen_height,
+                                     host=address[0], port=address[1])
+            print(f"Hosting on {address[0]}:{self.server.address[1]}")
+            address = ('127.0.0.1', self.server.address[1])
+        self.client = GameClient(address)
+
+        # Display-only copies of the other players
+        self.remote_players = {}
+        self.remote_sprites = pygame.sprite.Group()
+
+    def attach(self, player):
+        self.client.attach(player)
+
+    def update(self, player, input_bits):
+        """
+        Exchange packets for this tick. Call after the local player has been
+        updated with the inputs read before the update.
+
+        Args:
+            player (Player): The local player
+            input_bits (int): Inputs applied to the player this tick
+        """
+        self.client.send_input(input_bits)
+        if self.server:
+            self.server.step()
+        self.client.receive()
+        self._sync_remote_players()
+
+    def read_input(self, player):
+        return input_from_player(player)
+
+    def _sync_remote_players(self):
+        states = self.client.remote_states()
+
+        for player_id in list(self.remote_players):
+            if player_id not in states:
+                self.remote_players.pop(player_id).kill()
+
+        for player_id, state in states.items():
+            remote = self.remote_players.get(player_id)
+            if remote is None:
+                remote = Player(state[0], state[1], self.platforms,
+                                self.SCREEN_WIDTH, self.SCREEN_HEIGHT)
+                self.remote_players[player_id] = remote
+                self.remote_sprites.add(remote)
+            apply_player_state(remote, state)
+
+    def close(self):
+        self.client.disconnect()
+        if self.server:
+            self.server.close()
@@ -0,0 +1,123 @@
+"""
+Dystopia - Network Transport Module
+
+This module wraps a non-blocking UDP socket with traffic counters and an
+optional network condition simulator (latency, jitter and packet loss) for
+testing on localhost.
+"""
+
+import heapq
+import random
+import socket
+import time
+
+# Largest datagram we ever expect to receive
+MAX_PACKET_SIZE = 2048
+
+
+class NetworkConditions:
+    """Simulated one-way latency, jitter and packet loss for outgoing packets."""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, loss=0.0, seed=None):
+        """
+        Args:
+            latency_ms (float): Delay added to every packet
+            jitter_ms (float): Maximum extra random delay per packet
+            loss (float): Probability of dropping a packet (0-1)
+            seed (int, optional): Seed for reproducible runs
+        """
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.loss = loss
+        self.rng = random.Random(seed)
+
+    def delay(self):
+        """
+        Pick the delay for one packet.
+
+        Returns:
+            float or None: Delay in seconds, or None if the packet is dropped
+        """
+        if self.loss and self.rng.random() < self.loss:
+            return None
+        return self.latency + self.rng.uniform(0, self.jitter)
+
+
+class Transport:
+    """Non-blocking UDP socket with byte counters and simulated conditions."""
+
+    def __init__(self, bind_address=('127.0.0.1', 0), conditions=None, clock=time.monotonic):
+        """
+        Args:
+            bind_address (tuple): (host, port) to bind, port 0 picks a free port
+            conditions (NetworkConditions, optional): Simulated network conditions
+            clock (callable): Returns the current time in seconds
+        """
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.socket.bind(bind_address)
+        self.address = self.socket.getsockname()
+        self.conditions = conditions
+        self.clock = clock
+
+        # Packets held back by the simulated latency: (due time, order, data, address)
+        self._delayed = []
+        self._order = 0
+
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.packets_sent = 0
+        self.packets_received = 0
+        self.packets_dropped = 0
+
+    def send(self, data, address):
+        self.bytes_sent += len(data)
+        self.packets_sent += 1
+
+        if self.conditions is None:
+            self._send_now(data, address)
+            return
+
+        delay = self.conditions.delay()
+        if delay is None:
+            self.packets_dropped += 1
+            return
+        self._order += 1
+        heapq.heappush(self._delayed, (self.clock() + delay, self._order, data, address))
+        self.flush()
+
+    def _send_now(self, data, address):
+        try:
+            self.socket.sendto(data, address)
+        except OSError:
+            # UDP is fire and forget, a failed send is just a lost packet
+            self.packets_dropped += 1
+
+    def flush(self):
+        """Send every delayed packet whose simulated delay has passed."""
+        now = self.clock()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, data, address = heapq.heappop(self._delayed)
+            self._send_now(data, address)
+
+    def receive(self):
+        """
+        Read every packet waiting on the socket.
+
+        Returns:
+            list: (data, address) pairs
+        """
+        self.flush()
+        packets = []
+        while True:
+            try:
+                data, address = self.socket.recvfrom(MAX_PACKET_SIZE)
+            except (BlockingIOError, ConnectionResetError):
+                break
+            self.bytes_received += len(data)
+            self.packets_received += 1
+            packets.append((data, address))
+        return packets
+
+    def close(self):
+        self.socket.close()
@@ -0,0 +1,113 @@
+"""
+Dystopia - Allocation Soak Test
+
+Plays the level headlessly with scripted jumping and firing, then checks
+that once the game has warmed up, no frame's allocation peak (traced
+memory above the start of each phase of the frame, added up) exceeds a
+budget, nothing is left allocated from frame to frame, and no garbage
+collection ran mid-frame. The peak counts temporaries that are freed
+before the frame ends, so churn can't cancel out. With frame GC the
+automatic collector only runs mid-frame if a frame allocates far more
+objects than usual, so that check catches bursts of object allocation.
+Exits with status 1 if a check fails.
+
+Usage:
+    Run from the game directory (takes --frames / 60 seconds):
+    $ python soak.py
+    $ python soak.py --frames 3600 --budget 24
+"""
+
+import os
+import sys
+import argparse
+
+# Run without a window or audio device
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from main import setup_display, run_game_loop
+from utils.frame_gc import FrameGC, AllocationTracker
+
+
+def run_soak(frames=1800, warmup=300, frame_gc=True):
+    """
+    Play the level for a number of frames while tracking allocations.
+
+    Args:
+        frames (int): Frames to play in total
+        warmup (int): Frames at the start left out of the averages
+        frame_gc (bool): Collect garbage only between frames
+
+    Returns:
+        tuple: (stats over the frames after warm-up, the still tracing AllocationTracker)
+    """
+    pygame.init()
+    screen = setup_display(800, 600, "Dystopia soak")
+
+    # Scripted input: jump and fire on a timer
+    jump = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+    fire = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_f)
+    pygame.time.set_timer(jump, 700)
+    pygame.time.set_timer(fire, 400)
+
+    tracker = AllocationTracker(report_interval=0)
+    collector = FrameGC() if frame_gc else None
+    tracker.start()
+    run_game_loop(screen, 800, 600, frame_gc=collector, allocations=tracker, max_frames=frames)
+
+    pygame.time.set_timer(jump, 0)
+    pygame.time.set_timer(fire, 0)
+    return tracker.get_stats(frames - warmup), tracker
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dystopia allocation soak test")
+    parser.add_argument('--frames', type=int, default=1800, help="frames to play")
+    parser.add_argument('--warmup', type=int, default=300,
+                        help="frames left out of the averages")
+    parser.add_argument('--budget', type=float, default=32,
+                        help="allowed peak KiB allocated within a frame")
+    parser.add_argument('--leak-budget', type=float, default=1.0,
+                        help="allowed net memory blocks and objects per frame")
+    parser.add_argument('--no-frame-gc', action='store_true',
+                        help="let Python collect garbage at any time")
+    args = parser.parse_args(argv)
+
+    stats, tracker = run_soak(args.frames, args.warmup, not args.no_frame_gc)
+    print(f"Steady state over {stats['frames']} frames: "
+          f"{stats['blocks_per_frame']:+.2f} blocks/frame, "
+          f"{stats['objects_per_frame']:+.2f} objects/frame, "
+          f"peak {stats['mean_frame_peak_kb']:.1f} KiB/frame "
+          f"(max {stats['max_frame_peak_kb']:.1f}), "
+          f"{stats['mid_frame_collections']} mid-frame collections")
+
+    failures = []
+    if stats['max_frame_peak_kb'] > args.budget:
+        failures.append(f"frame peak of {stats['max_frame_peak_kb']:.1f} KiB "
+                        f"(budget {args.budget:g})")
+    if stats['blocks_per_frame'] > args.leak_budget:
+        failures.append(f"{stats['blocks_per_frame']:.2f} blocks per frame "
+                        f"(budget {args.leak_budget:g})")
+    if stats['objects_per_frame'] > args.leak_budget:
+        failures.append(f"{stats['objects_per_frame']:.2f} objects per frame "
+                        f"(budget {args.leak_budget:g})")
+    if stats['mid_frame_collections']:
+        failures.append(f"{stats['mid_frame_collections']} mid-frame collections")
+
+    if failures:
+        print(f"FAILED: {', '.join(failures)}")
+        print("Top allocation sites:")
+        for stat in tracker.top_sites():
+            frame = stat.traceback[0]
+            print(f"  {frame.filename}:{frame.lineno}: {stat.count_diff:+d} blocks")
+        tracker.stop()
+        return 1
+
+    tracker.stop()
+    print("PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
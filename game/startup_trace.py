@@ -0,0 +1,127 @@
+"""
+Dystopia - Startup Trace Module
+
+This module measures where startup time goes: how long every module import
+takes and how long each initialization step takes, up to the first frame
+of the start menu. It only uses the standard library so it can be started
+before pygame and the game modules are imported.
+
+Usage:
+    $ python main.py --trace-startup
+    or set DYSTOPIA_TRACE_STARTUP=1
+"""
+
+import builtins
+import os
+import sys
+import time
+
+
+class StartupTrace:
+    """Records import and initialization timings from process start."""
+
+    def __init__(self):
+        self.enabled = False
+        self.start_time = None
+        self.imports = []  # (name, depth, cumulative seconds, self seconds)
+        self.steps = []  # (name, seconds)
+        self.reported = False
+
+        self._original_import = None
+        self._stack = []  # child import time accumulated per active import
+
+    def start(self, enabled=None):
+        """
+        Start tracing if enabled.
+
+        Args:
+            enabled (bool, optional): Force tracing on or off. By default it is
+                on when --trace-startup is passed or DYSTOPIA_TRACE_STARTUP is set
+        """
+        if enabled is None:
+            enabled = ('--trace-startup' in sys.argv
+                       or bool(os.environ.get('DYSTOPIA_TRACE_STARTUP')))
+        self.enabled = enabled
+        if not enabled:
+            return
+
+        self.start_time = time.perf_counter()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Only time the first, absolute import of a module
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        depth = len(self._stack)
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.imports.append((name, depth, elapsed, elapsed - children))
+
+    def step(self, name):
+        """
+        Time an initialization step.
+
+        Usage:
+            with startup_trace.step('display'):
+                ...
+        """
+        return _Step(self, name)
+
+    def stop_imports(self):
+        """Stop timing imports and restore the normal import function."""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def first_frame(self):
+        """Mark the first menu frame as shown and print the report once."""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        self.stop_imports()
+        self.print_report(time.perf_counter() - self.start_time)
+
+    def print_report(self, total):
+        print("Startup trace")
+        print(f"  {'import':<40} {'cumulative ms':>14} {'self ms':>9}")
+        # Show slow imports only, in the order they finished loading
+        for name, depth, cumulative, own in self.imports:
+            if cumulative >= 0.001:
+                label = '  ' * depth + name
+                print(f"  {label:<40} {cumulative * 1000:>14.1f} {own * 1000:>9.1f}")
+
+        print(f"  {'step':<40} {'ms':>14}")
+        for name, elapsed in self.steps:
+            print(f"  {name:<40} {elapsed * 1000:>14.1f}")
+
+        top_level = sum(cumulative for _, depth, cumulative, _ in self.imports if depth == 0)
+        print(f"  {'total import time':<40} {top_level * 1000:>14.1f}")
+        print(f"  {'time to first menu frame':<40} {total * 1000:>14.1f}")
+
+
+class _Step:
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.trace.enabled:
+            self.trace.steps.append((self.name, time.perf_counter() - self.start))
+        return False
+
+
+# Shared trace for the whole process
+startup_trace = StartupTrace()
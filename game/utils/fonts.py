@@ -0,0 +1,29 @@
+"""
+Font utilities for the Dystopia game.
+
+This module provides cached font loading. The pygame font module is only
+initialized the first time a font is requested.
+"""
+
+import pygame
+
+_fonts = {}
+
+
+def get_font(size, name=None):
+    """
+    Get a font, loading it on first use.
+
+    Args:
+        size (int): Font size in pixels
+        name (str, optional): Font file path, None for the default font
+
+    Returns:
+        pygame.font.Font: The cached font
+    """
+    font = _fonts.get((name, size))
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = _fonts[(name, size)] = pygame.font.Font(name, size)
+    return font
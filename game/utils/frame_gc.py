@@ -0,0 +1,256 @@
+"""
+Garbage collection utilities for the Dystopia game.
+
+This module provides a frame-aware garbage collector and an optional
+per-frame allocation tracker. Python's cyclic collector normally runs
+whenever enough objects have been allocated, which can be in the middle
+of a frame and cause a hitch. FrameGC freezes everything that exists once
+a level has loaded, so it is never scanned again, and runs collections
+in the slot between frames. The automatic collector stays on with a much
+higher threshold, so it only runs mid-frame if a single frame allocates
+far more than usual.
+"""
+
+import gc
+import sys
+from array import array
+import time
+import tracemalloc
+
+
+class FrameGC:
+    """Runs the cyclic garbage collector between frames instead of mid-frame."""
+
+    def __init__(self, threshold_scale=10):
+        """
+        Args:
+            threshold_scale (int): Factor the automatic collector's first
+                threshold is raised by while active
+        """
+        self.threshold_scale = threshold_scale
+        self.active = False
+        self._thresholds = gc.get_threshold()
+
+        # Collections run per generation, and time spent in them
+        self.collections = [0, 0, 0]
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def start(self):
+        """
+        Take over collection. Call once the level has loaded: everything
+        alive at this point is moved to the permanent generation.
+
+        The automatic collector isn't disabled, only pushed back, as a
+        safety net: a frame that allocates many times more objects than a
+        collection cycle normally allows still gets collected, and shows up
+        as a mid-frame collection in the AllocationTracker.
+        """
+        self._thresholds = gc.get_threshold()
+        first, second, third = self._thresholds
+        gc.collect()
+        gc.freeze()
+        gc.set_threshold(first * self.threshold_scale, second, third)
+        self.active = True
+
+    def collect(self):
+        """
+        Run a collection if one is due. Call between frames, after the
+        display has been flipped.
+
+        Picks the oldest generation over its normal threshold, the same
+        choice the automatic collector would make.
+
+        Returns:
+            int: Generation collected, or -1 if none was due
+        """
+        if not self.active:
+            return -1
+
+        counts = gc.get_count()
+        thresholds = self._thresholds
+        for generation in (2, 1, 0):
+            if thresholds[generation] and counts[generation] > thresholds[generation]:
+                break
+        else:
+            return -1
+
+        start = time.perf_counter()
+        gc.collect(generation)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.collections[generation] += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        return generation
+
+    def stop(self):
+        """Unfreeze the level's objects and hand collection back to Python."""
+        if not self.active:
+            return
+        self.active = False
+        gc.unfreeze()
+        gc.set_threshold(*self._thresholds)
+
+    def get_stats(self):
+        """
+        Get collection counts and times.
+
+        Returns:
+            dict: Collections per generation, total and longest time in ms
+        """
+        return {
+            'collections': tuple(self.collections),
+            'total_ms': round(self.total_ms, 2),
+            'max_ms': round(self.max_ms, 2),
+        }
+
+
+class AllocationTracker:
+    """
+    Per-frame allocation diagnostic built on tracemalloc.
+
+    Block and object counts are net: allocated during a frame and still
+    alive at its end. They show leaks, but temporaries freed within the
+    frame cancel out, so churn is measured by the frame's peak instead: how
+    far traced memory rose above where each phase of the frame started,
+    added up over the phases marked with mark(). Splitting the frame into
+    phases stops a large temporary in one phase from hiding churn in
+    another. The tracker also counts collections that start in the middle
+    of a frame.
+
+    Needs Python 3.9+ for tracemalloc.reset_peak().
+    """
+
+    def __init__(self, report_interval=300, top=5, trace_frames=1):
+        """
+        Args:
+            report_interval (int): Frames between printed reports, 0 to never print
+            top (int): Number of allocation sites listed in a report
+            trace_frames (int): Stack frames stored per traced allocation
+        """
+        self.report_interval = report_interval
+        self.top = top
+        self.trace_frames = trace_frames
+
+        self.frame_count = 0
+        self.blocks = []  # Net memory blocks per frame
+        self.objects = []  # Net GC-tracked objects per frame
+        # Sum of each phase's traced memory peak above its start. An array
+        # holds plain numbers, so a frame's total isn't kept alive as an
+        # object and counted as a leaked block.
+        self.peak_bytes = array('q')
+        self.collection_frames = []  # Frame of each collection that started mid-frame
+
+        self._in_frame = False
+        self._start_blocks = 0
+        self._start_objects = 0
+        self._start_bytes = 0
+        self._frame_peak_bytes = 0
+        self._snapshot = None
+
+    def start(self):
+        """Start tracing allocations, with the current heap as the baseline."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+        gc.callbacks.append(self._on_gc)
+        self._snapshot = self._take_snapshot()
+
+    def stop(self):
+        """Stop tracing."""
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        tracemalloc.stop()
+        self._in_frame = False
+
+    def _on_gc(self, phase, info):
+        if phase == 'start' and self._in_frame:
+            self.collection_frames.append(self.frame_count)
+
+    def _take_snapshot(self):
+        # Leave out tracemalloc's own bookkeeping
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def begin_frame(self):
+        """Mark the start of a frame's work."""
+        self._start_blocks = sys.getallocatedblocks()
+        self._start_objects = gc.get_count()[0]
+        self._frame_peak_bytes = 0
+        tracemalloc.reset_peak()
+        self._start_bytes = tracemalloc.get_traced_memory()[0]
+        self._in_frame = True
+
+    def mark(self):
+        """Mark the end of one phase of the frame and the start of the next."""
+        current, peak = tracemalloc.get_traced_memory()
+        self._frame_peak_bytes += peak - self._start_bytes
+        tracemalloc.reset_peak()
+        self._start_bytes = current
+
+    def end_frame(self):
+        """Mark the end of a frame's work, before any between-frame collection."""
+        self.mark()
+        self._in_frame = False
+        self.blocks.append(sys.getallocatedblocks() - self._start_blocks)
+        self.objects.append(gc.get_count()[0] - self._start_objects)
+        self.peak_bytes.append(self._frame_peak_bytes)
+        self.frame_count += 1
+
+        if self.report_interval and self.frame_count % self.report_interval == 0:
+            self.print_report()
+
+    def get_stats(self, frames=None):
+        """
+        Average the per-frame counts.
+
+        Args:
+            frames (int, optional): Only use the most recent frames
+
+        Returns:
+            dict: Mean net blocks and objects per frame, mean and largest
+                per-frame peak in KiB and the number of mid-frame collections
+        """
+        blocks = self.blocks[-frames:] if frames else self.blocks
+        objects = self.objects[-frames:] if frames else self.objects
+        peak_bytes = self.peak_bytes[-frames:] if frames else self.peak_bytes
+        count = max(1, len(blocks))
+        first_frame = self.frame_count - len(blocks)
+        return {
+            'frames': len(blocks),
+            'blocks_per_frame': sum(blocks) / count,
+            'objects_per_frame': sum(objects) / count,
+            'mean_frame_peak_kb': sum(peak_bytes) / count / 1024,
+            'max_frame_peak_kb': max(peak_bytes, default=0) / 1024,
+            'mid_frame_collections': sum(1 for frame in self.collection_frames
+                                         if frame >= first_frame),
+        }
+
+    def top_sites(self):
+        """
+        Find where memory grew most since the last call.
+
+        Returns:
+            list: tracemalloc.StatisticDiff entries, largest growth first
+        """
+        snapshot = self._take_snapshot()
+        stats = snapshot.compare_to(self._snapshot, 'lineno')
+        self._snapshot = snapshot
+        return [stat for stat in stats if stat.count_diff > 0][:self.top]
+
+    def print_report(self):
+        """Print the per-frame averages and top allocation sites since the last report."""
+        frames = self.report_interval or len(self.blocks)
+        stats = self.get_stats(frames)
+        print(f"Allocations over {stats['frames']} frames: "
+              f"{stats['blocks_per_frame']:+.1f} blocks/frame, "
+              f"{stats['objects_per_frame']:+.1f} objects/frame, "
+              f"peak {stats['mean_frame_peak_kb']:.1f} KiB/frame "
+              f"(max {stats['max_frame_peak_kb']:.1f}), "
+              f"{stats['mid_frame_collections']} mid-frame collections")
+        for stat in self.top_sites():
+            frame = stat.traceback[0]
+            print(f"  {frame.filename}:{frame.lineno}: {stat.count_diff:+d} blocks, "
+                  f"{stat.size_diff / 1024:+.1f} KiB")
@@ -0,0 +1,84 @@
+"""
+Collision mask utilities for the Dystopia game.
+
+This module provides functions for precomputing collision masks for
+animation frames and movement states and for pixel-perfect collision tests.
+"""
+
+import pygame
+
+
+def get_frame_masks(frames):
+    """
+    Build a collision mask and tight bounding rect for each frame.
+
+    Args:
+        frames (list): List of pygame.Surface animation frames
+
+    Returns:
+        dict: Maps each frame surface to a (pygame.mask.Mask, pygame.Rect) pair,
+            where the rect bounds the mask's set pixels in frame coordinates
+    """
+    masks = {}
+    for frame in frames:
+        mask = pygame.mask.from_surface(frame)
+        masks[frame] = (mask, _mask_bounds(mask))
+    return masks
+
+
+def get_state_masks(frame_groups):
+    """
+    Build one collision mask for each movement state from its animation frames.
+
+    The mask is the union of the masks of all the state's frames, so going
+    from one frame of an animation to the next never changes the shape
+    that collides with platforms.
+
+    Args:
+        frame_groups (list): Lists of same-sized pygame.Surface frames, one per state
+
+    Returns:
+        dict: Maps each frame surface to its state's (pygame.mask.Mask, pygame.Rect)
+            pair, like get_frame_masks
+    """
+    masks = {}
+    for frames in frame_groups:
+        mask = pygame.mask.Mask(frames[0].get_size())
+        for frame in frames:
+            mask.draw(pygame.mask.from_surface(frame), (0, 0))
+        state_mask = (mask, _mask_bounds(mask))
+        for frame in frames:
+            masks[frame] = state_mask
+    return masks
+
+
+def _mask_bounds(mask):
+    # Tight rect around the mask's set pixels
+    rects = mask.get_bounding_rects()
+    if rects:
+        return rects[0].unionall(rects[1:])
+    return pygame.Rect(0, 0, 0, 0)
+
+
+def collide_mask_aabb(left, right):
+    """
+    Pixel-perfect collision test with a bounding box early-out.
+
+    Works with any objects that have ``rect`` and ``mask`` attributes, and
+    uses a ``collision_rect`` attribute as the bounding box when present.
+    Can be used as the collided callback of pygame.sprite.spritecollide.
+
+    Args:
+        left: The first sprite
+        right: The second sprite
+
+    Returns:
+        bool: True if the masks overlap
+    """
+    left_box = getattr(left, 'collision_rect', left.rect)
+    right_box = getattr(right, 'collision_rect', right.rect)
+    if not left_box.colliderect(right_box):
+        return False
+
+    offset = (right.rect.x - left.rect.x, right.rect.y - left.rect.y)
+    return left.mask.overlap(right.mask, offset) is not None
@@ -0,0 +1,128 @@
+"""
+Object pool utilities for the Dystopia game.
+
+This module provides a fixed-size object pool for high-churn game objects
+such as collectibles and projectiles. All objects are created up front and
+reset in place on spawn, so nothing is allocated while the game is running.
+"""
+
+
+class ObjectPool:
+    """
+    A preallocated pool of reusable objects.
+
+    Pooled objects must provide a ``reset(*args, **kwargs)`` method that
+    reinitializes them in place. The pool sets ``active`` and ``pool_index``
+    attributes on every object it manages.
+    """
+
+    def __init__(self, factory, size):
+        """
+        Create the pool and preallocate all of its objects.
+
+        Args:
+            factory (callable): Called with no arguments to create each object
+            size (int): Number of objects to preallocate
+        """
+        self.size = size
+        self.items = [factory() for _ in range(size)]
+
+        # Free objects are kept on a stack, active objects in a dense list
+        # so iteration never has to skip over inactive slots
+        self._free = list(reversed(self.items))
+        self.active = []
+
+        for item in self.items:
+            item.active = False
+            item.pool_index = -1
+
+        # Usage counters
+        self.spawn_count = 0
+        self.despawn_count = 0
+        self.exhausted_count = 0
+        self.peak_active = 0
+
+    def spawn(self, *args, **kwargs):
+        """
+        Take a free object from the pool and reset it with the given arguments.
+
+        Returns:
+            object or None: The spawned object, or None if the pool is exhausted
+        """
+        if not self._free:
+            self.exhausted_count += 1
+            return None
+
+        item = self._free.pop()
+        item.reset(*args, **kwargs)
+        item.active = True
+        item.pool_index = len(self.active)
+        self.active.append(item)
+
+        self.spawn_count += 1
+        if len(self.active) > self.peak_active:
+            self.peak_active = len(self.active)
+        return item
+
+    def despawn(self, item):
+        """
+        Return an active object to the pool.
+
+        Args:
+            item: An object previously returned by spawn()
+        """
+        if not item.active:
+            return
+
+        # Swap the last active object into the freed slot so removal is O(1)
+        index = item.pool_index
+        last = self.active.pop()
+        if last is not item:
+            self.active[index] = last
+            last.pool_index = index
+
+        item.active = False
+        item.pool_index = -1
+        self._free.append(item)
+        self.despawn_count += 1
+
+    def clear(self):
+        """Return every active object to the pool."""
+        while self.active:
+            self.despawn(self.active[-1])
+
+    @property
+    def in_use(self):
+        """int: Number of objects currently active."""
+        return len(self.active)
+
+    def get_stats(self, elapsed_seconds=None):
+        """
+        Get usage counters for the pool.
+
+        Args:
+            elapsed_seconds (float, optional): Time the counters cover, used to
+                compute spawn/despawn rates
+
+        Returns:
+            dict: Pool size, usage and spawn/despawn counters
+        """
+        stats = {
+            'size': self.size,
+            'in_use': len(self.active),
+            'peak_in_use': self.peak_active,
+            'spawned': self.spawn_count,
+            'despawned': self.despawn_count,
+            'exhausted': self.exhausted_count,
+        }
+        if elapsed_seconds:
+            stats['spawn_rate'] = self.spawn_count / elapsed_seconds
+            stats['despawn_rate'] = self.despawn_count / elapsed_seconds
+        return stats
+
+    def reset_stats(self):
+        """Reset the usage counters without touching active objects."""
+        self.spawn_count = 0
+        self.despawn_count = 0
+        self.exhausted_count = 0
+        self.peak_active = len(self.active)
@@ -0,0 +1,218 @@
+"""
+Render target utilities for the Dystopia game.
+
+This module provides an internal render target whose resolution can change
+at runtime, a scrolling camera view onto it, and a frame-time governor that
+picks the resolution so the game holds its frame rate on slow hardware.
+"""
+
+import pygame
+
+# Internal resolution scales, from full resolution down
+RESOLUTION_LEVELS = (1.0, 0.85, 0.7, 0.6, 0.5)
+
+# Drop the scaled image cache if it grows past this many entries
+MAX_CACHED_IMAGES = 512
+
+
+class RenderTarget:
+    """
+    An off-screen surface the game world is drawn to at a scaled resolution.
+
+    At full resolution the window itself is used as the target, so there is
+    no extra copy. At lower resolutions sprites are drawn from a cache of
+    pre-scaled images and the finished frame is scaled up to the window once
+    in present().
+    """
+
+    def __init__(self, window, levels=RESOLUTION_LEVELS):
+        """
+        Args:
+            window (pygame.Surface): The display surface
+            levels (tuple): Available resolution scales, highest first
+        """
+        self.window = window
+        self.levels = levels
+        self.level = 0
+        self.scale = levels[0]
+        self.surface = window
+
+        # Surfaces are created once per level and reused
+        self._surfaces = {}
+        self._scaled_images = {}
+
+    def set_level(self, level):
+        """
+        Switch to another internal resolution.
+
+        Args:
+            level (int): Index into the resolution levels
+        """
+        level = max(0, min(level, len(self.levels) - 1))
+        if level == self.level:
+            return
+
+        self.level = level
+        self.scale = self.levels[level]
+        self._scaled_images.clear()
+
+        if self.scale == 1.0:
+            self.surface = self.window
+        else:
+            surface = self._surfaces.get(level)
+            if surface is None:
+                width, height = self.window.get_size()
+                size = (int(width * self.scale), int(height * self.scale))
+                surface = pygame.Surface(size).convert()
+                self._surfaces[level] = surface
+            self.surface = surface
+
+    @property
+    def size(self):
+        """tuple: Current internal resolution in pixels."""
+        return self.surface.get_size()
+
+    def _get_scaled_image(self, image):
+        scaled = self._scaled_images.get(image)
+        if scaled is None:
+            if len(self._scaled_images) >= MAX_CACHED_IMAGES:
+                self._scaled_images.clear()
+            width = max(1, round(image.get_width() * self.scale))
+            height = max(1, round(image.get_height() * self.scale))
+            scaled = pygame.transform.scale(image, (width, height))
+            self._scaled_images[image] = scaled
+        return scaled
+
+    def fill(self, color):
+        self.surface.fill(color)
+
+    def blit(self, image, position):
+        """
+        Draw an image at a position given in window coordinates.
+
+        Args:
+            image (pygame.Surface): The image to draw
+            position (tuple or pygame.Rect): Top-left corner in window pixels
+        """
+        if self.scale == 1.0:
+            self.surface.blit(image, position)
+        else:
+            scale = self.scale
+            self.surface.blit(self._get_scaled_image(image),
+                              (int(position[0] * scale), int(position[1] * scale)))
+
+    def draw_group(self, group):
+        """Draw every sprite in a pygame.sprite.Group."""
+        if self.scale == 1.0:
+            group.draw(self.surface)
+        else:
+            for sprite in group:
+                self.blit(sprite.image, sprite.rect)
+
+    def present(self):
+        """Scale the finished frame up to the window."""
+        if self.surface is not self.window:
+            pygame.transform.scale(self.surface, self.window.get_size(), self.window)
+
+
+class CameraView:
+    """
+    Draws world coordinates through a RenderTarget, scrolled by a camera
+    position, for levels larger than the window. Sprites outside the view
+    are skipped.
+    """
+
+    def __init__(self, render_target, x=0, y=0):
+        """
+        Args:
+            render_target (RenderTarget): The target to draw to
+            x (int): World position of the left edge of the view
+            y (int): World position of the top edge of the view
+        """
+        self.render_target = render_target
+        self.x = x
+        self.y = y
+        self.width, self.height = render_target.window.get_size()
+
+    def blit(self, image, position):
+        """
+        Draw an image at a position given in world coordinates.
+
+        Args:
+            image (pygame.Surface): The image to draw
+            position (tuple or pygame.Rect): Top-left corner in world pixels
+        """
+        self.render_target.blit(image, (position[0] - self.x, position[1] - self.y))
+
+    def draw_group(self, group):
+        """Draw the sprites of a pygame.sprite.Group that are in view."""
+        left, top = self.x, self.y
+        right, bottom = left + self.width, top + self.height
+        for sprite in group:
+            rect = sprite.rect
+            if rect.right > left and rect.left < right and rect.bottom > top and rect.top < bottom:
+                self.render_target.blit(sprite.image, (rect.x - left, rect.y - top))
+
+
+class ResolutionGovernor:
+    """
+    Picks the internal resolution level from measured frame times.
+
+    Frame times are smoothed with an exponential moving average. The level
+    drops quickly when frames go over budget and only climbs back after a
+    longer stretch of headroom, so it does not oscillate between levels.
+    """
+
+    def __init__(self, render_target, fps=60, high_load=0.9, low_load=0.6,
+                 drop_delay=30, raise_delay=180, smoothing=0.1):
+        """
+        Args:
+            render_target (RenderTarget): The target whose level is adjusted
+            fps (int): Target frame rate
+            high_load (float): Fraction of the frame budget that triggers a drop
+            low_load (float): Fraction of the frame budget that allows a raise
+            drop_delay (int): Frames to wait after a change before dropping again
+            raise_delay (int): Frames to wait after a change before raising again
+            smoothing (float): Weight of the newest sample in the moving average
+        """
+        self.render_target = render_target
+        self.budget_ms = 1000 / fps
+        self.high_load = high_load
+        self.low_load = low_load
+        self.drop_delay = drop_delay
+        self.raise_delay = raise_delay
+        self.smoothing = smoothing
+
+        self.average_ms = 0.0
+        self.frames_since_change = 0
+
+    def update(self, frame_ms):
+        """
+        Record the work time of the last frame and adjust the resolution.
+
+        Args:
+            frame_ms (float): Time spent on the frame, excluding any frame
+                limiter delay (e.g. pygame.time.Clock.get_rawtime())
+
+        Returns:
+            bool: True if the resolution level changed
+        """
+        self.average_ms += (frame_ms - self.average_ms) * self.smoothing
+        self.frames_since_change += 1
+
+        target = self.render_target
+        load = self.average_ms / self.budget_ms
+        level = target.level
+
+        if load > self.high_load and self.frames_since_change >= self.drop_delay:
+            level += 1
+        elif load < self.low_load and self.frames_since_change >= self.raise_delay:
+            level -= 1
+
+        level = max(0, min(level, len(target.levels) - 1))
+        if level == target.level:
+            return False
+
+        target.set_level(level)
+        self.frames_since_change = 0
+        return True
@@ -0,0 +1,97 @@
+"""
+Spatial hashing utilities for the Dystopia game.
+
+This module provides a uniform grid that buckets objects by the cells their
+rectangles overlap, so overlap queries only look at nearby objects.
+"""
+
+
+class SpatialHash:
+    """A uniform grid spatial index for objects with a ``rect`` attribute."""
+
+    def __init__(self, cell_size=64):
+        """
+        Create an empty spatial hash.
+
+        Args:
+            cell_size (int): Width and height of each grid cell in pixels
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+        # Remember which cells each object was inserted into for removal
+        self._object_cells = {}
+
+    def _cells_for_rect(self, rect):
+        size = self.cell_size
+        x0 = rect.left // size
+        y0 = rect.top // size
+        x1 = (rect.right - 1) // size
+        y1 = (rect.bottom - 1) // size
+        return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+
+    def insert(self, obj):
+        """
+        Add an object to the index using its current rect.
+
+        Args:
+            obj: Any object with a ``rect`` attribute
+        """
+        keys = self._cells_for_rect(obj.rect)
+        for key in keys:
+            bucket = self.cells.get(key)
+            if bucket is None:
+                bucket = self.cells[key] = []
+            bucket.append(obj)
+        self._object_cells[obj] = keys
+
+    def remove(self, obj):
+        """
+        Remove an object from the index.
+
+        Args:
+            obj: An object previously passed to insert()
+        """
+        keys = self._object_cells.pop(obj, None)
+        if keys is None:
+            return
+        for key in keys:
+            bucket = self.cells[key]
+            bucket.remove(obj)
+            if not bucket:
+                del self.cells[key]
+
+    def move(self, obj):
+        """Re-index an object after its rect has changed."""
+        self.remove(obj)
+        self.insert(obj)
+
+    def clear(self):
+        """Remove every object from the index."""
+        self.cells.clear()
+        self._object_cells.clear()
+
+    def query(self, rect):
+        """
+        Find all indexed objects whose rect overlaps the given rect.
+
+        Args:
+            rect (pygame.Rect): The area to search
+
+        Returns:
+            list: Overlapping objects, each reported once
+        """
+        size = self.cell_size
+        cells = self.cells
+        found = []
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    continue
+                for obj in bucket:
+                    if obj not in found and rect.colliderect(obj.rect):
+                        found.append(obj)
+        return found
+
+    def __len__(self):
+        return len(self._object_cells)
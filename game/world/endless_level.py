@@ -0,0 +1,159 @@
+"""
+Dystopia - Endless Level Module
+
+This module runs an endless level. Chunks of platforms come from a
+ChunkPipeline working ahead of the camera, are turned into platform
+sprites as they come into range, and are recycled once the camera has
+passed them, so the number of platforms, coins and sprites stays the same
+however far the player runs.
+"""
+
+from collections import deque
+from world.game_platform import Platform
+from world.level_generator import ChunkGenerator, ChunkPipeline
+
+
+class EndlessLevel:
+    """A level that scrolls right forever, generated as the player runs."""
+
+    def __init__(self, player, platforms, screen_width, screen_height, seed=None,
+                 collectibles=None, chunks_ahead=2):
+        """
+        Args:
+            player (Player): The player, whose physics the level is built for
+            platforms (pygame.sprite.Group): Group the player collides with,
+                filled with the level's platforms
+            screen_width (int): Width of the view
+            screen_height (int): Height of the level
+            seed (int, optional): Seed of the level, random if None
+            collectibles (CollectibleSystem, optional): Coins are placed on
+                new chunks and despawned with old ones
+            chunks_ahead (int): Chunks loaded past the right edge of the view
+        """
+        self.player = player
+        self.platforms = platforms
+        self.collectibles = collectibles
+        self.SCREEN_WIDTH = screen_width
+        self.SCREEN_HEIGHT = screen_height
+        self.chunks_ahead = chunks_ahead
+
+        self.generator = ChunkGenerator.from_player(player, seed, chunk_width=screen_width)
+        self.pipeline = ChunkPipeline(self.generator, ahead=chunks_ahead)
+
+        # Loaded chunks and their platform sprites, oldest first
+        self.chunks = deque()
+        # Platform sprites from recycled chunks, ready for reuse
+        self.free_platforms = []
+
+        # World position of the left edge of the view
+        self.camera_x = 0
+
+        # Counters for tuning
+        self.loaded_count = 0
+        self.recycled_count = 0
+        self.created_platforms = 0
+        self.stall_count = 0  # Frames that waited for the pipeline
+
+        # The player can run forever to the right, but not back off screen
+        player.bounds_right = None
+        self._load_chunks()
+        self._update_spawn_point()
+
+    @property
+    def seed(self):
+        return self.generator.seed
+
+    @property
+    def distance(self):
+        """int: How far the view has scrolled, in pixels."""
+        return self.camera_x
+
+    def update(self):
+        """Scroll the view with the player and load and recycle chunks."""
+        # Scroll forward only, keeping the player in the left third of the view
+        target = self.player.collision_rect.centerx - self.SCREEN_WIDTH // 3
+        if target > self.camera_x:
+            self.camera_x = target
+        self.player.bounds_left = self.camera_x
+        if self.collectibles:
+            self.collectibles.view_x = self.camera_x
+
+        self._recycle_chunks()
+        self._load_chunks()
+        self._update_spawn_point()
+
+    def _load_chunks(self):
+        load_until = self.camera_x + self.SCREEN_WIDTH * (1 + self.chunks_ahead)
+        while not self.chunks or self.chunks[-1][0].end_x < load_until:
+            # Only wait for the pipeline when the view would run off the level
+            must_wait = (not self.chunks
+                         or self.chunks[-1][0].end_x < self.camera_x + self.SCREEN_WIDTH)
+            if must_wait and self.chunks:
+                self.stall_count += 1
+            chunk = self.pipeline.next_chunk(block=must_wait)
+            if chunk is None:
+                break
+            self._load_chunk(chunk)
+
+    def _load_chunk(self, chunk):
+        sprites = []
+        for rect in chunk.rects:
+            if self.free_platforms:
+                platform = self.free_platforms.pop()
+                platform.reset(rect.x, rect.y, rect.width, rect.height)
+            else:
+                platform = Platform(rect.x, rect.y, rect.width, rect.height)
+                self.created_platforms += 1
+            self.platforms.add(platform)
+            sprites.append(platform)
+
+        if self.collectibles:
+            self.collectibles.place_on_platforms(platforms=sprites)
+
+        self.chunks.append((chunk, sprites))
+        self.loaded_count += 1
+
+    def _recycle_chunks(self):
+        # Keep at least one chunk so there is always somewhere to respawn
+        while len(self.chunks) > 1 and self.chunks[0][0].end_x < self.camera_x:
+            chunk, sprites = self.chunks.popleft()
+            for platform in sprites:
+                platform.kill()
+            self.free_platforms.extend(sprites)
+            if self.collectibles:
+                self.collectibles.despawn_before(chunk.end_x)
+            self.recycled_count += 1
+
+    def _update_spawn_point(self):
+        # Respawn above the first platform that starts inside the view
+        for chunk, sprites in self.chunks:
+            for platform in sprites:
+                if platform.rect.left >= self.camera_x:
+                    self.player.spawn_point = (
+                        platform.rect.centerx - self.player.rect.width // 2,
+                        platform.rect.top - self.player.rect.height,
+                    )
+                    return
+
+    def close(self):
+        """Stop the background generator."""
+        self.pipeline.close()
+
+    def get_stats(self):
+        """
+        Get chunk and platform counters.
+
+        Returns:
+            dict: Seed, chunks loaded/recycled/in memory, platform sprites
+                created and pooled, and frames stalled on the pipeline
+        """
+        return {
+            'seed': self.seed,
+            'distance': self.distance,
+            'chunks_loaded': self.loaded_count,
+            'chunks_recycled': self.recycled_count,
+            'chunks_in_memory': len(self.chunks),
+            'platforms_created': self.created_platforms,
+            'platforms_pooled': len(self.free_platforms),
+            'stalls': self.stall_count,
+        }
@@ -0,0 +1,263 @@
+"""
+Dystopia - Level Generator Module
+
+This module generates an endless level as a sequence of platform chunks.
+ChunkGenerator lays each chunk out from a seed and only keeps a platform
+if the jump to it from the previous one works when simulated with the
+Player's physics (GRAVITY, JUMP_POWER, PLAYER_SPEED), so every chunk can
+be completed. ChunkPipeline runs the generator on a background thread so
+chunks are ready before the camera reaches them.
+"""
+
+import queue
+import random
+import threading
+import pygame
+
+
+class Chunk:
+    """A generated stretch of level."""
+
+    def __init__(self, index, rects):
+        """
+        Args:
+            index (int): Position of the chunk in the level, counting from 0
+            rects (list): Platform rects in world coordinates, left to right
+        """
+        self.index = index
+        self.rects = rects
+        self.start_x = rects[0].left
+        self.end_x = rects[-1].right
+
+    def __repr__(self):
+        return f"Chunk({self.index}, {self.start_x}..{self.end_x}, {len(self.rects)} platforms)"
+
+
+class ChunkGenerator:
+    """Seeded generator of platform chunks that are always reachable."""
+
+    def __init__(self, screen_height, seed=None, chunk_width=800, gravity=1, jump_power=17,
+                 speed=5, agent_size=(54, 67), platform_height=20, tile_width=32, attempts=12):
+        """
+        Args:
+            screen_height (int): Height of the level
+            seed (int, optional): Seed of the level, random if None
+            chunk_width (int): Minimum width of a chunk
+            gravity (int): Gravity added to vertical velocity each frame
+            jump_power (int): Upward velocity of a jump
+            speed (int): Horizontal speed in pixels per frame
+            agent_size (tuple): Width and height of the agent's largest hitbox
+            platform_height (int): Height of generated platforms
+            tile_width (int): Platform widths are multiples of this
+            attempts (int): Random platforms tried before falling back to an easy one
+        """
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.chunk_width = chunk_width
+        self.gravity = gravity
+        self.jump_power = jump_power
+        self.speed = speed
+        self.agent_size = agent_size
+        self.platform_height = platform_height
+        self.attempts = attempts
+        self.screen_height = screen_height
+
+        # Whole tiles only, so platforms can share a few cached images
+        self.widths = range(3 * tile_width, 11 * tile_width, tile_width)
+
+        # Keep platform tops between the HUD and the bottom of the screen
+        self.min_top = screen_height // 3
+        self.max_top = screen_height - 60
+
+        # Height a jump rises, for picking candidate platforms
+        self.jump_height = 0
+        velocity = -jump_power + gravity
+        while velocity < 0:
+            self.jump_height -= velocity
+            velocity += gravity
+
+    @classmethod
+    def from_player(cls, player, seed=None, chunk_width=800):
+        """Create a generator using a Player's physics constants and hitbox sizes."""
+        bounds = [bounds for _, bounds in player.frame_masks.values()]
+        agent_size = (max(b.width for b in bounds), max(b.height for b in bounds))
+        return cls(player.SCREEN_HEIGHT, seed, chunk_width, gravity=player.GRAVITY,
+                   jump_power=player.JUMP_POWER, speed=player.PLAYER_SPEED,
+                   agent_size=agent_size)
+
+    def first_platform(self):
+        """The wide platform a level starts on."""
+        return pygame.Rect(0, self.max_top - 40, 15 * 32, self.platform_height)
+
+    def generate(self, index, entry=None):
+        """
+        Generate one chunk.
+
+        Args:
+            index (int): Position of the chunk in the level
+            entry (pygame.Rect, optional): Last platform of the previous
+                chunk, None for the first chunk
+
+        Returns:
+            Chunk: The new chunk
+        """
+        # Each chunk has its own stream of random numbers, so a level only
+        # depends on its seed
+        rng = random.Random(self.seed * 1000003 + index)
+        rects = []
+        if entry is None:
+            entry = self.first_platform()
+            rects.append(entry)
+
+        end_x = (index + 1) * self.chunk_width
+        previous = entry
+        while previous.right < end_x:
+            previous = self._next_platform(rng, previous)
+            rects.append(previous)
+
+        return Chunk(index, rects)
+
+    def _next_platform(self, rng, previous):
+        max_rise = int(self.jump_height * 0.75)
+        max_gap = self.speed * self.jump_power * 2
+        for attempt in range(self.attempts):
+            # Later attempts pick from smaller gaps and height changes
+            scale = 1 - attempt / self.attempts
+            rise = rng.randint(-int(max_rise * scale), int(max_rise * scale))
+            top = max(self.min_top, min(previous.top - rise, self.max_top))
+            gap = rng.randint(self.speed * 4, max(self.speed * 4, int(max_gap * scale)))
+            width = rng.choice(self.widths)
+            candidate = pygame.Rect(previous.right + gap, top, width, self.platform_height)
+            if self.reachable(previous, candidate):
+                return candidate
+
+        # Fall back to a short hop at the same height
+        candidate = pygame.Rect(previous.right + self.speed * 4, previous.top,
+                                self.widths[-1], self.platform_height)
+        if not self.reachable(previous, candidate):
+            raise RuntimeError("Player physics can't make the shortest jump")
+        return candidate
+
+    def reachable(self, source, target):
+        """
+        Check that the agent can get from one platform onto the next.
+
+        Tries running off the edge and jumping from a few takeoff points,
+        holding right for different numbers of frames.
+
+        Returns:
+            bool: True if some input sequence lands on the target
+        """
+        width = self.agent_size[0]
+        takeoffs = (source.right - width // 2, source.right - width,
+                    source.right - width - self.speed * 4)
+        for jump in (True, False):
+            for hold_frames in (None, 24, 16, 10, 6):
+                for start_x in takeoffs:
+                    if start_x >= source.left and self._simulate(
+                            source, target, start_x, jump, hold_frames):
+                        return True
+        return False
+
+    def _simulate(self, source, target, start_x, jump, hold_frames):
+        """
+        Simulate the agent from standing on the source platform, the same
+        way Player.update moves it (gravity, then horizontal, then vertical
+        movement). Touching a platform anywhere but from above fails.
+
+        Args:
+            source (pygame.Rect): Platform the agent starts on
+            target (pygame.Rect): Platform to land on
+            start_x (int): Left edge of the agent's hitbox at the start
+            jump (bool): Jump on the first frame, otherwise run off the edge
+            hold_frames (int or None): Frames to hold right, None for all of them
+
+        Returns:
+            bool: True if the agent comes to stand on the target
+        """
+        width, height = self.agent_size
+        box = pygame.Rect(start_x, source.top - height, width, height)
+        velocity_y = -self.jump_power if jump else 0
+        platforms = (source, target)
+
+        for frame in range(300):
+            velocity_y += self.gravity
+            if hold_frames is None or frame < hold_frames:
+                box.x += self.speed
+                if box.collidelist(platforms) != -1:
+                    return False
+
+            previous_bottom = box.bottom
+            box.y += velocity_y
+            hit = box.collidelist(platforms)
+            if hit != -1:
+                platform = platforms[hit]
+                if velocity_y <= 0 or previous_bottom > platform.top:
+                    return False
+                if platform is target:
+                    # Count it only if the whole hitbox is over the target:
+                    # the player's mask may not reach the corners of its box
+                    return target.left <= box.left and box.right <= target.right
+                # Still standing on the source
+                box.bottom = platform.top
+                velocity_y = 0
+            elif box.top > self.screen_height:
+                return False
+
+        return False
+
+
+class ChunkPipeline:
+    """
+    Generates chunks in order on a background thread, staying a fixed
+    number of chunks ahead of the ones taken by the game.
+    """
+
+    def __init__(self, generator, ahead=2):
+        """
+        Args:
+            generator (ChunkGenerator): The generator to run
+            ahead (int): Finished chunks kept ready
+        """
+        self.generator = generator
+        self.ready = queue.Queue(maxsize=ahead)
+        self.generated = 0
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="chunk-pipeline", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        entry = None
+        index = 0
+        while not self._stopping.is_set():
+            chunk = self.generator.generate(index, entry)
+            entry = chunk.rects[-1]
+            index += 1
+
+            # Wait for room in the queue, which is the game taking a chunk
+            while not self._stopping.is_set():
+                try:
+                    self.ready.put(chunk, timeout=0.1)
+                    self.generated += 1
+                    break
+                except queue.Full:
+                    pass
+
+    def next_chunk(self, block=False):
+        """
+        Take the next chunk.
+
+        Args:
+            block (bool): Wait for the chunk if it isn't finished yet
+
+        Returns:
+            Chunk or None: The chunk, or None if not ready and not blocking
+        """
+        try:
+            return self.ready.get(block)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Stop the background thread."""
+        self._stopping.set()
+        self._thread.join()
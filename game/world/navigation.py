@@ -0,0 +1,362 @@
+"""
+Dystopia - Navigation Module
+
+This module builds a navigation graph over the level's platforms for AI
+movement. Each platform top is a node; edges are walks onto touching
+platforms, jumps and falls that are possible under the same discrete
+physics the Player uses (GRAVITY, JUMP_POWER, PLAYER_SPEED). Paths are
+found with A* and cached until the level changes, and a batch query runs
+one search per goal for any number of agents.
+
+Jump and fall edges only check that the arc can land on the target; they
+don't check whether another platform is in the way of the arc.
+"""
+
+import heapq
+import pygame
+
+# Edge kinds
+WALK = 'walk'
+JUMP = 'jump'
+FALL = 'fall'
+
+
+class NavEdge:
+    """A move from one platform to another."""
+
+    def __init__(self, source, target, kind, takeoff_x, landing_x, cost):
+        """
+        Args:
+            source (int): Index of the platform the move starts on
+            target (int): Index of the platform the move ends on
+            kind (str): WALK, JUMP or FALL
+            takeoff_x (int): X position to leave the source platform from
+            landing_x (int): X position the move lands at on the target
+            cost (float): Estimated time of the move in frames
+        """
+        self.source = source
+        self.target = target
+        self.kind = kind
+        self.takeoff_x = takeoff_x
+        self.landing_x = landing_x
+        self.cost = cost
+
+    def __repr__(self):
+        return f"NavEdge({self.source} -> {self.target}, {self.kind}, cost={self.cost:.1f})"
+
+
+def _trajectory(initial_velocity, gravity, max_drop):
+    """
+    Vertical offsets of an airborne agent per frame, matching Player.update
+    (velocity is increased by gravity before the position is moved).
+
+    Returns:
+        list: Offset from the start height after each frame, positive is down
+    """
+    offsets = []
+    velocity = initial_velocity
+    offset = 0
+    while offset <= max_drop:
+        velocity += gravity
+        offset += velocity
+        offsets.append(offset)
+    return offsets
+
+
+def _landing_frame(offsets, drop):
+    """
+    Find the first frame an arc comes down through a platform top.
+
+    Args:
+        offsets (list): Vertical offsets per frame from _trajectory()
+        drop (int): Height of the target top below the start, negative if above
+
+    Returns:
+        int or None: Number of frames in the air, or None if never reached
+    """
+    previous = 0
+    for frame, offset in enumerate(offsets, 1):
+        if offset > previous and previous < drop <= offset:
+            return frame
+        previous = offset
+    return None
+
+
+class NavGraph:
+    """Navigation graph over platform tops with cached pathfinding."""
+
+    def __init__(self, platforms, gravity=1, jump_power=17, speed=5, agent_width=40,
+                 max_drop=600):
+        """
+        Args:
+            platforms (iterable): Platform sprites (or rects) of the level
+            gravity (int): Gravity added to vertical velocity each frame
+            jump_power (int): Upward velocity of a jump
+            speed (int): Horizontal speed in pixels per frame
+            agent_width (int): Width of the agent's collision box
+            max_drop (int): Longest fall that is considered
+        """
+        self.gravity = gravity
+        self.jump_power = jump_power
+        self.speed = speed
+        self.agent_width = agent_width
+        self.max_drop = max_drop
+
+        self._jump_offsets = _trajectory(-jump_power, gravity, max_drop)
+        self._fall_offsets = _trajectory(0, gravity, max_drop)
+
+        self.version = 0
+        self.rects = []
+        self.edges = []
+        self.reverse_edges = []
+        self.path_cache = {}
+        self.rebuild(platforms)
+
+    @classmethod
+    def from_player(cls, player, platforms, max_drop=None):
+        """Build a graph using a Player's physics constants and hitbox width."""
+        return cls(platforms, gravity=player.GRAVITY, jump_power=player.JUMP_POWER,
+                   speed=player.PLAYER_SPEED, agent_width=player.collision_rect.width,
+                   max_drop=max_drop or player.SCREEN_HEIGHT)
+
+    def rebuild(self, platforms):
+        """
+        Rebuild the graph for new level geometry and drop all cached paths.
+
+        Args:
+            platforms (iterable): Platform sprites (or rects) of the level
+        """
+        self.rects = [pygame.Rect(getattr(platform, 'rect', platform)) for platform in platforms]
+        count = len(self.rects)
+        self.edges = [[] for _ in range(count)]
+        self.reverse_edges = [[] for _ in range(count)]
+
+        for source in range(count):
+            for target in range(count):
+                if source != target:
+                    edge = self._find_edge(source, target)
+                    if edge is not None:
+                        self.edges[source].append(edge)
+                        self.reverse_edges[target].append(edge)
+
+        self.version += 1
+        self.path_cache.clear()
+
+    def refresh(self, platforms):
+        """
+        Rebuild the graph only if the platform geometry changed.
+
+        Returns:
+            bool: True if the graph was rebuilt
+        """
+        rects = [getattr(platform, 'rect', platform) for platform in platforms]
+        if rects == self.rects:
+            return False
+        self.rebuild(rects)
+        return True
+
+    def _find_edge(self, source, target):
+        a = self.rects[source]
+        b = self.rects[target]
+        drop = b.top - a.top
+        half_width = self.agent_width // 2
+
+        # Walk straight across onto a touching platform at the same height
+        if drop == 0 and b.left <= a.right and b.right >= a.left:
+            landing_x = b.left + half_width if b.centerx > a.centerx else b.right - half_width
+            return NavEdge(source, target, WALK, landing_x, landing_x,
+                           abs(b.centerx - a.centerx) / self.speed)
+
+        # Horizontal distance the agent has to cover in the air. Only the
+        # source and target are considered: other platforms in the arc's way
+        # are not checked.
+        if b.left > a.right:
+            gap = b.left - a.right
+            takeoff_x, landing_x = a.right, b.left + half_width
+        elif b.right < a.left:
+            gap = a.left - b.right
+            takeoff_x, landing_x = a.left, b.right - half_width
+        elif drop < 0 and a.left <= b.left - half_width:
+            # Target overhangs the source, jump up past its left end
+            gap = self.agent_width
+            takeoff_x, landing_x = b.left - half_width, b.left + half_width
+        elif drop < 0 and a.right >= b.right + half_width:
+            # Target overhangs the source, jump up past its right end
+            gap = self.agent_width
+            takeoff_x, landing_x = b.right + half_width, b.right - half_width
+        else:
+            # Platforms overlap and can't be jumped through, only falling
+            # off the end of the source can reach the target
+            gap = None
+
+        # Falling off an edge: only reaches platforms below that stick out past it
+        if drop > 0 and (b.left < a.left or b.right > a.right):
+            frames = _landing_frame(self._fall_offsets, drop)
+            if frames is not None:
+                if b.right > a.right:
+                    fall_gap = max(0, b.left - a.right)
+                    fall_takeoff, fall_landing = a.right, max(b.left, a.right) + half_width
+                else:
+                    fall_gap = max(0, a.left - b.right)
+                    fall_takeoff, fall_landing = a.left, min(b.right, a.left) - half_width
+                if fall_gap <= self.speed * frames:
+                    return NavEdge(source, target, FALL, fall_takeoff, fall_landing,
+                                   self._move_cost(a, b, fall_takeoff, fall_landing, frames))
+
+        # Jumping, landing while coming down through the target's top
+        if gap is None:
+            return None
+        frames = _landing_frame(self._jump_offsets, drop)
+        if frames is not None and gap <= self.speed * frames:
+            return NavEdge(source, target, JUMP, takeoff_x, landing_x,
+                           self._move_cost(a, b, takeoff_x, landing_x, frames))
+
+        return None
+
+    def _move_cost(self, a, b, takeoff_x, landing_x, frames):
+        # Walk from the middle of the source to the takeoff point, spend the
+        # given frames in the air, then walk to the middle of the target.
+        # The agent can't move faster than its speed in the air either, so
+        # the airborne part takes at least as long as covering the distance
+        # from takeoff to landing; this keeps the A* heuristic admissible.
+        walking = abs(takeoff_x - a.centerx) + abs(b.centerx - landing_x)
+        airborne = max(frames, abs(landing_x - takeoff_x) / self.speed)
+        return walking / self.speed + airborne
+
+    def node_at(self, rect, tolerance=4):
+        """
+        Find the platform an agent is standing on.
+
+        Args:
+            rect (pygame.Rect): The agent's collision rect
+            tolerance (int): Allowed gap between feet and platform top
+
+        Returns:
+            int or None: Platform index, or None if airborne
+        """
+        for index, platform in enumerate(self.rects):
+            if (abs(rect.bottom - platform.top) <= tolerance
+                    and rect.right > platform.left and rect.left < platform.right):
+                return index
+        return None
+
+    def _heuristic(self, node, goal):
+        # Lower bound on the frames needed to cover the horizontal distance.
+        # Every edge costs at least the horizontal distance between the
+        # middles of its platforms divided by the speed, so this never
+        # overestimates.
+        distance = abs(self.rects[goal].centerx - self.rects[node].centerx)
+        return distance / self.speed
+
+    def find_path(self, start, goal):
+        """
+        Find the cheapest sequence of moves between two platforms with A*.
+
+        Args:
+            start (int): Platform index to start from
+            goal (int): Platform index to reach
+
+        Returns:
+            list or None: NavEdges to follow, empty if already there, or None
+                if the goal can't be reached
+        """
+        key = (start, goal)
+        if key in self.path_cache:
+            return self.path_cache[key]
+
+        best = {start: 0.0}
+        came_from = {}
+        open_heap = [(self._heuristic(start, goal), 0.0, start)]
+        path = None
+
+        while open_heap:
+            _, cost, node = heapq.heappop(open_heap)
+            if node == goal:
+                path = []
+                while node != start:
+                    edge = came_from[node]
+                    path.append(edge)
+                    node = edge.source
+                path.reverse()
+                break
+            if cost > best[node]:
+                continue
+            for edge in self.edges[node]:
+                new_cost = cost + edge.cost
+                if new_cost < best.get(edge.target, float('inf')):
+                    best[edge.target] = new_cost
+                    came_from[edge.target] = edge
+                    heapq.heappush(open_heap, (new_cost + self._heuristic(edge.target, goal),
+                                               new_cost, edge.target))
+
+        self.path_cache[key] = path
+        return path
+
+    def _search_to_goal(self, goal):
+        """
+        Run one backwards Dijkstra search from a goal.
+
+        Returns:
+            dict: Maps every node that can reach the goal to the first edge of
+                its cheapest path there
+        """
+        best = {goal: 0.0}
+        next_edge = {}
+        open_heap = [(0.0, goal)]
+        while open_heap:
+            cost, node = heapq.heappop(open_heap)
+            if cost > best[node]:
+                continue
+            for edge in self.reverse_edges[node]:
+                new_cost = cost + edge.cost
+                if new_cost < best.get(edge.source, float('inf')):
+                    best[edge.source] = new_cost
+                    next_edge[edge.source] = edge
+                    heapq.heappush(open_heap, (new_cost, edge.source))
+        return next_edge
+
+    def find_paths(self, requests):
+        """
+        Answer many path queries at once, sharing one search per goal.
+
+        Use this when many agents need paths in the same frame: agents
+        chasing the same target cost a single search between them.
+
+        Args:
+            requests (list): (start, goal) platform index pairs
+
+        Returns:
+            list: One path per request, as returned by find_path()
+        """
+        searches = {}
+        results = []
+        for start, goal in requests:
+            key = (start, goal)
+            if key not in self.path_cache:
+                next_edge = searches.get(goal)
+                if next_edge is None:
+                    next_edge = searches[goal] = self._search_to_goal(goal)
+
+                if start == goal:
+                    path = []
+                elif start in next_edge:
+                    path = []
+                    node = start
+                    while node != goal:
+                        edge = next_edge[node]
+                        path.append(edge)
+                        node = edge.target
+                else:
+                    path = None
+                self.path_cache[key] = path
+            results.append(self.path_cache[key])
+        return results
+
+    def draw_debug(self, surface):
+        """Draw every edge of the graph, for debugging."""
+        colors = {WALK: (0, 255, 0), JUMP: (255, 255, 0), FALL: (0, 200, 255)}
+        for edges in self.edges:
+            for edge in edges:
+                start = (edge.takeoff_x, self.rects[edge.source].top)
+                end = (edge.landing_x, self.rects[edge.target].top)
+                pygame.draw.line(surface, colors[edge.kind], start, end, 1)
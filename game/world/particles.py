@@ -0,0 +1,330 @@
+"""
+Dystopia - Particle System Module
+
+This module handles environmental particle effects such as dust, sparks,
+rain and ash. Particles are stored in NumPy arrays and advanced in bulk
+instead of being individual sprites, and drawn by writing their pixels
+straight into the target surface, so tens of thousands of them fit in the
+frame budget.
+"""
+
+import itertools
+import pygame
+import numpy as np
+
+
+# Particle kinds. Point kinds cover a single pixel, the others a small
+# footprint of pixels written at offsets from the particle's position.
+DUST = 0
+SPARK = 1
+RAIN = 2
+ASH = 3
+
+# Per-kind settings: (color, gravity, drag, is_point)
+PARTICLE_KINDS = {
+    DUST: ((150, 135, 110), 0.0, 0.99, True),
+    SPARK: ((255, 190, 60), 0.25, 0.96, True),
+    RAIN: ((120, 140, 170), 0.3, 1.0, False),
+    ASH: ((90, 90, 90), 0.01, 0.995, False),
+}
+
+# Column layout of the particle data array
+X, Y, VX, VY, LIFE = range(5)
+
+
+def _particle_size(kind, is_point):
+    """Width and height in pixels of a particle kind."""
+    if is_point:
+        return (1, 1)
+    if kind == RAIN:
+        return (1, 6)
+    return (2, 2)
+
+
+def _make_particle_image(size, color):
+    """Create the small surface used to blit a particle kind."""
+    image = pygame.Surface(size)
+    image.fill(color)
+    return image
+
+
+class ParticleEmitter:
+    """Continuously spawns particles of one kind inside an area."""
+
+    def __init__(self, kind, rate, area, velocity_x, velocity_y, lifetime):
+        """
+        Args:
+            kind (int): Particle kind (DUST, SPARK, RAIN or ASH)
+            rate (float): Particles spawned per frame
+            area (tuple): (x, y, width, height) spawn area
+            velocity_x (tuple): (min, max) horizontal starting velocity
+            velocity_y (tuple): (min, max) vertical starting velocity
+            lifetime (tuple): (min, max) lifetime in frames
+        """
+        self.kind = kind
+        self.rate = rate
+        self.area = area
+        self.velocity_x = velocity_x
+        self.velocity_y = velocity_y
+        self.lifetime = lifetime
+        self.accumulator = 0.0
+
+    def update(self, particles):
+        self.accumulator += self.rate
+        count = int(self.accumulator)
+        if count:
+            self.accumulator -= count
+            particles.emit(self.kind, count, self.area,
+                           self.velocity_x, self.velocity_y, self.lifetime)
+
+
+class ParticleSystem:
+    """
+    Bulk particle simulation backed by NumPy arrays.
+
+    Live particles are always packed into the first ``count`` rows of the
+    arrays; dead and off-screen particles are compacted out once per update
+    by moving particles from the end into the freed rows.
+    """
+
+    def __init__(self, screen_width, screen_height, capacity=25000, seed=None):
+        self.SCREEN_WIDTH = screen_width
+        self.SCREEN_HEIGHT = screen_height
+        self.capacity = capacity
+        self.count = 0
+
+        self.data = np.zeros((capacity, 5), dtype=np.float32)
+        self.kinds = np.zeros(capacity, dtype=np.uint8)
+        self.rng = np.random.default_rng(seed)
+        self.emitters = []
+
+        # Lookup tables indexed by particle kind
+        kind_count = max(PARTICLE_KINDS) + 1
+        self.gravity = np.zeros(kind_count, dtype=np.float32)
+        self.drag = np.ones(kind_count, dtype=np.float32)
+        self.is_point = np.zeros(kind_count, dtype=bool)
+        self.images = {}
+        sizes = {}
+        for kind, (color, gravity, drag, is_point) in PARTICLE_KINDS.items():
+            self.gravity[kind] = gravity
+            self.drag[kind] = drag
+            self.is_point[kind] = is_point
+            sizes[kind] = _particle_size(kind, is_point)
+            self.images[kind] = _make_particle_image(sizes[kind], color)
+
+        # Pixel offsets from a particle's position covered by each kind,
+        # padded with (0, 0) to the largest footprint
+        footprint = max(width * height for width, height in sizes.values())
+        self.footprints = np.zeros(kind_count, dtype=np.intp)
+        self.offset_x = np.zeros((footprint, kind_count), dtype=np.intp)
+        self.offset_y = np.zeros((footprint, kind_count), dtype=np.intp)
+        for kind, (width, height) in sizes.items():
+            self.footprints[kind] = width * height
+            for i in range(width * height):
+                self.offset_x[i, kind] = i % width
+                self.offset_y[i, kind] = i // width
+
+        # Scratch buffers for updating and drawing, so a frame allocates
+        # nothing per live particle
+        self._factor = np.zeros(capacity, dtype=np.float32)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._test = np.zeros(capacity, dtype=bool)
+        self._scaled = np.zeros(capacity, dtype=np.float32)
+        self._xs = np.zeros(capacity, dtype=np.intp)
+        self._ys = np.zeros(capacity, dtype=np.intp)
+        self._pixel_xs = np.zeros(capacity, dtype=np.intp)
+        self._pixel_ys = np.zeros(capacity, dtype=np.intp)
+        self._kind_index = np.zeros(capacity, dtype=np.intp)
+        self._colors = np.zeros(capacity, dtype=np.uint32)
+
+        # Mapped pixel colors depend on the target surface format
+        self._mapped_colors = None
+        self._mapped_format = None
+
+    def emit(self, kind, count, area, velocity_x, velocity_y, lifetime):
+        """
+        Spawn a batch of particles with random positions and velocities.
+
+        Args:
+            kind (int): Particle kind
+            count (int): Number of particles to spawn
+            area (tuple): (x, y, width, height) spawn area
+            velocity_x (tuple): (min, max) horizontal starting velocity
+            velocity_y (tuple): (min, max) vertical starting velocity
+            lifetime (tuple): (min, max) lifetime in frames
+
+        Returns:
+            int: Number of particles actually spawned
+        """
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return 0
+
+        start = self.count
+        end = start + count
+        x, y, width, height = area
+        block = self.data[start:end]
+        block[:, X] = self.rng.uniform(x, x + width, count)
+        block[:, Y] = self.rng.uniform(y, y + height, count)
+        block[:, VX] = self.rng.uniform(velocity_x[0], velocity_x[1], count)
+        block[:, VY] = self.rng.uniform(velocity_y[0], velocity_y[1], count)
+        block[:, LIFE] = self.rng.uniform(lifetime[0], lifetime[1], count)
+        self.kinds[start:end] = kind
+        self.count = end
+        return count
+
+    def burst(self, kind, x, y, count=20, speed=4.0, lifetime=(15, 30)):
+        """Spawn particles flying outward from a single point."""
+        return self.emit(kind, count, (x, y, 1, 1),
+                         (-speed, speed), (-speed, speed * 0.5), lifetime)
+
+    def add_emitter(self, emitter):
+        self.emitters.append(emitter)
+        return emitter
+
+    def update(self):
+        for emitter in self.emitters:
+            emitter.update(self)
+
+        n = self.count
+        if n == 0:
+            return
+
+        data = self.data[:n]
+        kind_index = self._kind_index[:n]
+        np.copyto(kind_index, self.kinds[:n])
+
+        # Integrate all particles at once
+        factor = np.take(self.drag, kind_index, out=self._factor[:n], mode='clip')
+        data[:, VX] *= factor
+        data[:, VY] *= factor
+        data[:, VY] += np.take(self.gravity, kind_index, out=factor, mode='clip')
+        data[:, X] += data[:, VX]
+        data[:, Y] += data[:, VY]
+        data[:, LIFE] -= 1
+
+        # Cull dead and off-screen particles
+        alive = np.greater(data[:, LIFE], 0, out=self._alive[:n])
+        test = self._test[:n]
+        alive &= np.greater_equal(data[:, X], 0, out=test)
+        alive &= np.less(data[:, X], self.SCREEN_WIDTH, out=test)
+        alive &= np.greater_equal(data[:, Y], 0, out=test)
+        alive &= np.less(data[:, Y], self.SCREEN_HEIGHT, out=test)
+
+        if not alive.all():
+            dead = np.flatnonzero(np.logical_not(alive, out=test))
+            live = n - len(dead)
+            # Fill the freed rows before the new end with the live particles
+            # past it; there are exactly as many of each
+            holes = dead[:np.searchsorted(dead, live)]
+            sources = np.flatnonzero(alive[live:])
+            sources += live
+            self.data[holes] = self.data[sources]
+            self.kinds[holes] = self.kinds[sources]
+            self.count = live
+
+    def clear(self):
+        self.count = 0
+
+    def _get_mapped_colors(self, surface):
+        surface_format = (surface.get_bitsize(), surface.get_masks())
+        if self._mapped_format != surface_format:
+            colors = np.zeros(len(self.gravity), dtype=np.uint32)
+            for kind, settings in PARTICLE_KINDS.items():
+                colors[kind] = surface.map_rgb(settings[0])
+            self._mapped_colors = colors
+            self._mapped_format = surface_format
+        return self._mapped_colors
+
+    def draw(self, surface, scale=1.0):
+        """
+        Draw all live particles.
+
+        Args:
+            surface (pygame.Surface): The surface to draw on
+            scale (float): Factor from window to surface coordinates
+        """
+        n = self.count
+        if n == 0:
+            return
+
+        data = self.data[:n]
+        kinds = self.kinds[:n]
+        xs = self._xs[:n]
+        ys = self._ys[:n]
+        width, height = surface.get_size()
+        if scale == 1.0:
+            np.copyto(xs, data[:, X], casting='unsafe')
+            np.copyto(ys, data[:, Y], casting='unsafe')
+        else:
+            scaled = self._scaled[:n]
+            np.multiply(data[:, X], scale, out=scaled)
+            np.copyto(xs, scaled, casting='unsafe')
+            np.multiply(data[:, Y], scale, out=scaled)
+            np.copyto(ys, scaled, casting='unsafe')
+            # Rounding can push edge particles just past a scaled surface
+            np.minimum(xs, width - 1, out=xs)
+            np.minimum(ys, height - 1, out=ys)
+
+        # 32-bit surfaces: write every particle's pixels into the pixel array,
+        # one offset of the footprint at a time
+        if surface.get_bytesize() == 4:
+            # take() only writes straight into out when not bounds checking;
+            # kinds are always valid indices
+            kind_index = self._kind_index[:n]
+            np.copyto(kind_index, kinds)
+            colors = np.take(self._get_mapped_colors(surface), kind_index,
+                             out=self._colors[:n], mode='clip')
+            present = np.bincount(kind_index, minlength=len(self.footprints)) > 0
+            footprint = self.footprints[present].max()
+
+            pixels = pygame.surfarray.pixels2d(surface)
+            pixels[xs, ys] = colors
+            pixel_xs = self._pixel_xs[:n]
+            pixel_ys = self._pixel_ys[:n]
+            for i in range(1, footprint):
+                # Smaller kinds are padded with (0, 0) and redraw their own pixel.
+                # Footprints overhanging the edge are clipped onto it.
+                np.take(self.offset_x[i], kind_index, out=pixel_xs, mode='clip')
+                np.take(self.offset_y[i], kind_index, out=pixel_ys, mode='clip')
+                np.add(pixel_xs, xs, out=pixel_xs)
+                np.add(pixel_ys, ys, out=pixel_ys)
+                np.minimum(pixel_xs, width - 1, out=pixel_xs)
+                np.minimum(pixel_ys, height - 1, out=pixel_ys)
+                pixels[pixel_xs, pixel_ys] = colors
+            # Release the surface lock before anything else blits to it
+            del pixels
+            return
+
+        # Other surfaces: one batched blit per kind
+        for kind, image in self.images.items():
+            selected = kinds == kind
+            if not selected.any():
+                continue
+            positions = zip(xs[selected].tolist(), ys[selected].tolist())
+            surface.blits(zip(itertools.repeat(image), positions), doreturn=False)
+
+
+def create_environment_emitters(particles, screen_width, screen_height, weather='ash'):
+    """
+    Add the ambient emitters for the level's weather.
+
+    Args:
+        particles (ParticleSystem): The particle system to add emitters to
+        screen_width (int): Width of the game window
+        screen_height (int): Height of the game window
+        weather (str): 'ash' or 'rain'
+    """
+    # Dust drifting near the ground
+    particles.add_emitter(ParticleEmitter(
+        DUST, 4, (0, screen_height - 120, screen_width, 100),
+        (0.2, 1.0), (-0.3, 0.1), (60, 180)))
+
+    if weather == 'rain':
+        particles.add_emitter(ParticleEmitter(
+            RAIN, 20, (0, 0, screen_width, 10),
+            (-2.5, -1.5), (8, 11), (60, 90)))
+    else:
+        particles.add_emitter(ParticleEmitter(
+            ASH, 3, (0, 0, screen_width, 10),
+            (-0.6, 0.6), (0.5, 1.2), (300, 600)))
@@ -0,0 +1,300 @@
+"""
+Dystopia - World Snapshot Module
+
+This module captures the simulation state of a level (player, collectibles,
+projectiles and score) into compact fixed-size binary records. Records are
+kept in a ring buffer for instant rewind and restart, and can be saved to
+and loaded from disk.
+"""
+
+import struct
+
+# File header: magic, format version, record size, record count
+FILE_MAGIC = b'DYSN'
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct('<4sHII')
+
+# Frame number, score, active collectible count, active projectile count
+HEADER = struct.Struct('<IiHH')
+
+# rect x/y, collision_rect x/y/w/h, velocity x/y, flags, animation frame/timer
+PLAYER = struct.Struct('<iiiiiihhBHH')
+
+# rect x/y, value, animation frame/timer
+COLLECTIBLE = struct.Struct('<iihBB')
+
+# rect x/y, velocity x/y, lifetime
+PROJECTILE = struct.Struct('<iihhh')
+
+# Player flag bits
+ON_GROUND = 1
+FACING_RIGHT = 2
+
+
+class WorldSnapshot:
+    """
+    Packs and unpacks the state of one level into a fixed-size record.
+
+    The record size only depends on the pool sizes, so every record of a
+    level has the same layout and can be stored back to back in one buffer.
+    """
+
+    def __init__(self, player, collectibles):
+        """
+        Args:
+            player (Player): The player to capture
+            collectibles (CollectibleSystem): The level's collectibles and projectiles
+        """
+        self.player = player
+        self.collectibles = collectibles
+        self.frame = 0
+
+        self._collectibles_offset = HEADER.size + PLAYER.size
+        self._projectiles_offset = (self._collectibles_offset
+                                    + COLLECTIBLE.size * collectibles.collectibles.size)
+        self.record_size = (self._projectiles_offset
+                            + PROJECTILE.size * collectibles.projectiles.size)
+
+        # Pooled coins share their animation frames
+        coins = collectibles.collectibles.items
+        self._coin_frame_count = len(coins[0].frames) if coins else 0
+
+    def new_record(self):
+        """Allocate an empty buffer big enough for one record."""
+        return bytearray(self.record_size)
+
+    def write(self, buffer, offset=0):
+        """
+        Capture the current state into a buffer.
+
+        Args:
+            buffer (bytearray): Destination buffer
+            offset (int): Byte offset of the record in the buffer
+        """
+        player = self.player
+        system = self.collectibles
+        active_collectibles = system.collectibles.active
+        active_projectiles = system.projectiles.active
+
+        HEADER.pack_into(buffer, offset, self.frame, system.score,
+                         len(active_collectibles), len(active_projectiles))
+
+        flags = 0
+        if player.on_ground:
+            flags |= ON_GROUND
+        if player.facing_right:
+            flags |= FACING_RIGHT
+        collision_rect = player.collision_rect
+        PLAYER.pack_into(buffer, offset + HEADER.size,
+                         player.rect.x, player.rect.y,
+                         collision_rect.x, collision_rect.y,
+                         collision_rect.width, collision_rect.height,
+                         player.velocity_x, player.velocity_y, flags,
+                         player.current_frame, player.animation_timer)
+
+        position = offset + self._collectibles_offset
+        for collectible in active_collectibles:
+            COLLECTIBLE.pack_into(buffer, position,
+                                  collectible.rect.x, collectible.rect.y, collectible.value,
+                                  collectible.current_frame, collectible.animation_timer)
+            position += COLLECTIBLE.size
+
+        position = offset + self._projectiles_offset
+        for projectile in active_projectiles:
+            PROJECTILE.pack_into(buffer, position,
+                                 projectile.rect.x, projectile.rect.y,
+                                 projectile.velocity_x, projectile.velocity_y,
+                                 projectile.lifetime)
+            position += PROJECTILE.size
+
+    def validate(self, buffer, offset=0):
+        """
+        Check that a record only refers to objects this level has, so it can
+        be read without running out of pooled objects or animation frames.
+
+        Args:
+            buffer (bytes or bytearray): Buffer holding the record
+            offset (int): Byte offset of the record in the buffer
+
+        Raises:
+            ValueError: If a count is larger than its pool or a coin's
+                animation frame doesn't exist
+        """
+        _, _, collectible_count, projectile_count = HEADER.unpack_from(buffer, offset)
+        if collectible_count > self.collectibles.collectibles.size:
+            raise ValueError(f"Snapshot has {collectible_count} collectibles, "
+                             f"the pool holds {self.collectibles.collectibles.size}")
+        if projectile_count > self.collectibles.projectiles.size:
+            raise ValueError(f"Snapshot has {projectile_count} projectiles, "
+                             f"the pool holds {self.collectibles.projectiles.size}")
+
+        position = offset + self._collectibles_offset
+        for _ in range(collectible_count):
+            frame = COLLECTIBLE.unpack_from(buffer, position)[3]
+            if frame >= self._coin_frame_count:
+                raise ValueError(f"Snapshot coin frame {frame} does not exist")
+            position += COLLECTIBLE.size
+
+    def read(self, buffer, offset=0):
+        """
+        Restore the state stored in a buffer.
+
+        Args:
+            buffer (bytearray): Source buffer
+            offset (int): Byte offset of the record in the buffer
+        """
+        player = self.player
+        system = self.collectibles
+
+        (self.frame, system.score,
+         collectible_count, projectile_count) = HEADER.unpack_from(buffer, offset)
+
+        (player.rect.x, player.rect.y, cx, cy, cw, ch,
+         player.velocity_x, player.velocity_y, flags,
+         player.current_frame, player.animation_timer) = PLAYER.unpack_from(buffer, offset + HEADER.size)
+        player.on_ground = bool(flags & ON_GROUND)
+        player.facing_right = bool(flags & FACING_RIGHT)
+        player.update_animation_frame()
+        player.collision_rect.update(cx, cy, cw, ch)
+
+        # Respawn pooled objects in place of whatever is active now, without
+        # counting the restore as gameplay spawns in the pool stats
+        collectible_pool = system.collectibles
+        projectile_pool = system.projectiles
+        pool_counters = (collectible_pool.spawn_count, collectible_pool.despawn_count,
+                         projectile_pool.spawn_count, projectile_pool.despawn_count)
+        system.clear()
+
+        position = offset + self._collectibles_offset
+        for _ in range(collectible_count):
+            x, y, value, frame, timer = COLLECTIBLE.unpack_from(buffer, position)
+            collectible = system.spawn_collectible(x, y, value)
+            collectible.current_frame = frame
+            collectible.animation_timer = timer
+            collectible.image = collectible.frames[frame]
+            position += COLLECTIBLE.size
+
+        position = offset + self._projectiles_offset
+        for _ in range(projectile_count):
+            x, y, velocity_x, velocity_y, lifetime = PROJECTILE.unpack_from(buffer, position)
+            projectile = system.spawn_projectile(0, 0, velocity_x, velocity_y)
+            projectile.rect.x = x
+            projectile.rect.y = y
+            projectile.lifetime = lifetime
+            position += PROJECTILE.size
+
+        (collectible_pool.spawn_count, collectible_pool.despawn_count,
+         projectile_pool.spawn_count, projectile_pool.despawn_count) = pool_counters
+
+
+class RewindBuffer:
+    """Ring buffer holding the most recent snapshots of a level."""
+
+    def __init__(self, snapshot, seconds=5, fps=60):
+        """
+        Args:
+            snapshot (WorldSnapshot): Packs and unpacks the level state
+            seconds (float): How much history to keep
+            fps (int): Snapshots recorded per second
+        """
+        self.snapshot = snapshot
+        self.capacity = int(seconds * fps)
+        self.record_size = snapshot.record_size
+        self.buffer = bytearray(self.capacity * self.record_size)
+        self.head = 0  # Slot the next record is written to
+        self.count = 0
+
+    def record(self):
+        """Capture the current state, overwriting the oldest record when full."""
+        self.snapshot.frame += 1
+        self.snapshot.write(self.buffer, self.head * self.record_size)
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def rewind(self, frames=1):
+        """
+        Step back in time, discarding the newer records.
+
+        Args:
+            frames (int): Number of recorded frames to step back
+
+        Returns:
+            bool: False if there was no history left to rewind to
+        """
+        if self.count <= 1:
+            return False
+
+        # The newest record is the current state, so keep at least one
+        frames = min(frames, self.count - 1)
+        self.head = (self.head - frames) % self.capacity
+        self.count -= frames
+
+        newest = (self.head - 1) % self.capacity
+        self.snapshot.read(self.buffer, newest * self.record_size)
+        return True
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def _ordered_slots(self):
+        start = (self.head - self.count) % self.capacity
+        return [(start + i) % self.capacity for i in range(self.count)]
+
+    def save(self, path):
+        """
+        Write the recorded history to a file, oldest record first.
+
+        Args:
+            path (str): Destination file path
+        """
+        with open(path, 'wb') as snapshot_file:
+            snapshot_file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION,
+                                                 self.record_size, self.count))
+            view = memoryview(self.buffer)
+            for slot in self._ordered_slots():
+                start = slot * self.record_size
+                snapshot_file.write(view[start:start + self.record_size])
+
+    def load(self, path):
+        """
+        Replace the recorded history with the contents of a file and restore
+        the newest record.
+
+        Args:
+            path (str): Source file path
+
+        Raises:
+            ValueError: If the file is not a snapshot file for this level
+                layout, is truncated, or holds a record this level can't
+                restore
+        """
+        with open(path, 'rb') as snapshot_file:
+            header = snapshot_file.read(FILE_HEADER.size)
+            if len(header) != FILE_HEADER.size:
+                raise ValueError(f"Not a snapshot file: {path}")
+            magic, version, record_size, count = FILE_HEADER.unpack(header)
+            if magic != FILE_MAGIC or version != FILE_VERSION:
+                raise ValueError(f"Not a snapshot file: {path}")
+            if record_size != self.record_size:
+                raise ValueError(f"Snapshot record size {record_size} does not match "
+                                 f"this level ({self.record_size})")
+
+            # Only the newest records fit if the file holds more than capacity
+            skip = max(0, count - self.capacity)
+            snapshot_file.seek(skip * record_size, 1)
+            count -= skip
+            data = snapshot_file.read(count * record_size)
+            if len(data) != count * record_size or snapshot_file.read(1):
+                raise ValueError(f"Snapshot file is truncated or corrupt: {path}")
+
+        # Check every record before replacing the history with them
+        for index in range(count):
+            self.snapshot.validate(data, index * record_size)
+
+        self.buffer[:len(data)] = data
+        self.count = count
+        self.head = count % self.capacity
+        if count:
+            self.snapshot.read(self.buffer, (count - 1) * record_size)
@@ -9,6 +9,7 @@ import pygame
 import os
 import sys
 from utils import load_image
+from utils.fonts import get_font
 
 
 def load_audio(name):
@@ -85,15 +86,14 @@ class StartScreen:
         self.DARK_GRAY = (40, 40, 40)
         self.LIGHT_GRAY = (150, 150, 150)
         
-        # Initialize fonts first
-        pygame.font.init()
-        self.title_font = pygame.font.Font(None, 80)
-        self.button_font = pygame.font.Font(None, 50)
+        # Fonts are loaded on first use
+        self.button_font = get_font(50)
         
         # Load background image
         try:
-            self.background = load_image('background.png')
-            self.background = pygame.transform.scale(self.background, (screen_width, screen_height))
+            # Scale before converting so only the screen-sized copy is converted
+            background = pygame.image.load(os.path.join('assets', 'background.png'))
+            self.background = pygame.transform.scale(background, (screen_width, screen_height)).convert()
         except:
             self.background = None
             
@@ -110,22 +110,12 @@ class StartScreen:
         
         # Create title text if no logo
         if not self.logo:
+            self.title_font = get_font(80)
             self.title_text = self.title_font.render("DYSTOPIA", True, self.WHITE)
             self.title_rect = self.title_text.get_rect(centerx=screen_width//2, y=screen_height//6)
         
-        # Initialize pygame mixer if not already initialized
-        if not pygame.mixer.get_init():
-            pygame.mixer.init()
-        
-        # Load background music
-        try:
-            pygame.mixer.music.load(os.path.join('assets', 'background_music.mp3'))
-            pygame.mixer.music.set_volume(0.5)  # Set to 50% volume
-            pygame.mixer.music.play(-1)  # -1 means loop indefinitely
-            self.music_playing = True
-        except:
-            print("Could not load background music")
-            self.music_playing = False
+        # Music is started after the first frame, see start_music()
+        self.music_playing = False
         
         # Now create the music button after font initialization
         self.music_button = Button(
@@ -239,8 +229,35 @@ class StartScreen:
                 
         return None
     
+    def start_music(self):
+        """
+        Initialize the mixer and start the background music.
+        
+        Opening the audio device is slow, so this is called once the first
+        menu frame is on screen instead of during startup.
+        """
+        # Initialize pygame mixer if not already initialized
+        if not pygame.mixer.get_init():
+            try:
+                pygame.mixer.init()
+            except pygame.error:
+                print("Could not initialize audio")
+                return
+        
+        # Load background music
+        try:
+            pygame.mixer.music.load(os.path.join('assets', 'background_music.mp3'))
+            pygame.mixer.music.set_volume(0.5)  # Set to 50% volume
+            pygame.mixer.music.play(-1)  # -1 means loop indefinitely
+            self.music_playing = True
+        except:
+            print("Could not load background music")
+            self.music_playing = False
+    
     def toggle_music(self):
         """Toggle background music on/off."""
+        if not pygame.mixer.get_init():
+            return
         if pygame.mixer.music.get_busy():
             pygame.mixer.music.pause()
             self.music_button.text = "|>"  # Unicode muted speaker